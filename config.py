@@ -65,11 +65,106 @@ AUTO_GCAST_MSG = getenv("AUTO_GCAST_MSG", "")
 SPOTIFY_CLIENT_ID = getenv("SPOTIFY_CLIENT_ID", "bcfe26b0ebc3428882a0b5fb3e872473")
 SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", "907c6a054c214005aeae1fd752273cc4")
 
+# How long (in seconds) to reuse fetched spotify playlist/album track lists, how often to retry a
+# rate-limited request, the longest Retry-After (in seconds) worth waiting for and how many pages
+# of one playlist to fetch at once.
+SPOTIFY_CACHE_TTL = int(getenv("SPOTIFY_CACHE_TTL", "21600"))
+SPOTIFY_RETRIES = int(getenv("SPOTIFY_RETRIES", "4"))
+SPOTIFY_MAX_RETRY_AFTER = float(getenv("SPOTIFY_MAX_RETRY_AFTER", "10"))
+SPOTIFY_PAGE_WORKERS = int(getenv("SPOTIFY_PAGE_WORKERS", "4"))
+
 
 # Maximum limit for fetching playlist's track from youtube, spotify, apple links.
 SERVER_PLAYLIST_LIMIT = int(getenv("SERVER_PLAYLIST_LIMIT", "50"))
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", "25"))
 
+# How many youtube search results to keep in memory and for how long (in seconds).
+YT_METADATA_CACHE_SIZE = int(getenv("YT_METADATA_CACHE_SIZE", "2048"))
+YT_METADATA_CACHE_TTL = int(getenv("YT_METADATA_CACHE_TTL", "3600"))
+
+# How many spotify/apple track names to remember the matching youtube video of, and for how long (in seconds).
+YT_QUERY_CACHE_SIZE = int(getenv("YT_QUERY_CACHE_SIZE", "8192"))
+YT_QUERY_CACHE_TTL = int(getenv("YT_QUERY_CACHE_TTL", "604800"))
+
+# How many playlist entries to look up on youtube at once while importing a playlist.
+PLAYLIST_RESOLVE_WORKERS = int(getenv("PLAYLIST_RESOLVE_WORKERS", "6"))
+
+# Worker processes used to render now-playing thumbnails, and the disk budget (in bytes) for rendered cards.
+THUMB_WORKERS = int(getenv("THUMB_WORKERS", "2"))
+THUMB_CACHE_LIMIT = int(getenv("THUMB_CACHE_LIMIT", 209715200))
+
+# How many upcoming queue entries to download in the background, how many of those downloads may run at once
+# across all chats, and their combined bandwidth budget in bytes per second (0 = unlimited).
+PREFETCH_AHEAD = int(getenv("PREFETCH_AHEAD", "2"))
+PREFETCH_WORKERS = int(getenv("PREFETCH_WORKERS", "3"))
+PREFETCH_RATE_LIMIT = int(getenv("PREFETCH_RATE_LIMIT", "0"))
+
+# yt-dlp extractor workers kept warm in the background, how many jobs may wait for them, the per-job timeout for lookups and how long (in seconds, 0 for no limit) a caller waits on a media download.
+YTDL_WORKERS = int(getenv("YTDL_WORKERS", "4"))
+YTDL_QUEUE_SIZE = int(getenv("YTDL_QUEUE_SIZE", "64"))
+YTDL_TIMEOUT = int(getenv("YTDL_TIMEOUT", "300"))
+YTDL_DOWNLOAD_TIMEOUT = int(getenv("YTDL_DOWNLOAD_TIMEOUT", "1800"))
+
+# Disk budget (in bytes) for played tracks kept in downloads/ for replays, and how to evict them [ lru | lfu ].
+DOWNLOAD_CACHE_LIMIT = int(getenv("DOWNLOAD_CACHE_LIMIT", 2147483648))
+DOWNLOAD_CACHE_POLICY = getenv("DOWNLOAD_CACHE_POLICY", "lru").lower()
+
+# Local journal of every chat's queue, how often it is flushed (in seconds) and the oldest snapshot (in seconds) resumed after a restart.
+QUEUE_JOURNAL = getenv("QUEUE_JOURNAL", "cache/queues.journal")
+QUEUE_JOURNAL_INTERVAL = float(getenv("QUEUE_JOURNAL_INTERVAL", "2"))
+QUEUE_RESUME_MAX_AGE = int(getenv("QUEUE_RESUME_MAX_AGE", "1800"))
+
+# Seconds between progress-bar refreshes of a now-playing message, how many message edits per second all refreshes may share, and the minimum seconds between two edits in one chat.
+PROGRESS_INTERVAL = float(getenv("PROGRESS_INTERVAL", "7"))
+PROGRESS_RATE = float(getenv("PROGRESS_RATE", "20"))
+PROGRESS_CHAT_GAP = float(getenv("PROGRESS_CHAT_GAP", "3"))
+
+# Threads for blocking soundcloud calls, and how long (in seconds) any one platform call may take.
+SOUNDCLOUD_WORKERS = int(getenv("SOUNDCLOUD_WORKERS", "2"))
+PLATFORM_TIMEOUT = int(getenv("PLATFORM_TIMEOUT", "60"))
+
+# Outbound HTTP pool: total and per-host connection limits, DNS cache and keep-alive lifetimes, request timeout (all seconds) and retries.
+HTTP_LIMIT = int(getenv("HTTP_LIMIT", "100"))
+HTTP_LIMIT_PER_HOST = int(getenv("HTTP_LIMIT_PER_HOST", "10"))
+HTTP_DNS_TTL = int(getenv("HTTP_DNS_TTL", "300"))
+HTTP_KEEPALIVE = float(getenv("HTTP_KEEPALIVE", "30"))
+HTTP_TIMEOUT = int(getenv("HTTP_TIMEOUT", "30"))
+HTTP_RETRIES = int(getenv("HTTP_RETRIES", "2"))
+
+# Seconds to remember the meta tags read from an Apple Music or Resso page.
+META_CACHE_TTL = int(getenv("META_CACHE_TTL", "3600"))
+
+# Log a stack trace whenever the event loop is blocked for longer than this many seconds.
+LOOP_LAG_THRESHOLD = float(getenv("LOOP_LAG_THRESHOLD", "0.5"))
+
+# Serve Prometheus metrics on this address at /metrics (set METRICS_PORT to 0 to disable).
+METRICS_HOST = getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(getenv("METRICS_PORT", "0"))
+
+# Assistant placement: how many audio calls one video call counts as, failures within ASSISTANT_ERROR_WINDOW seconds that mark an assistant unhealthy, and how much busier an idle chat's assistant must be than the best one before the chat is moved.
+ASSISTANT_VIDEO_WEIGHT = float(getenv("ASSISTANT_VIDEO_WEIGHT", "3"))
+ASSISTANT_ERROR_LIMIT = int(getenv("ASSISTANT_ERROR_LIMIT", "3"))
+ASSISTANT_ERROR_WINDOW = int(getenv("ASSISTANT_ERROR_WINDOW", "300"))
+ASSISTANT_REBALANCE_MARGIN = float(getenv("ASSISTANT_REBALANCE_MARGIN", "2"))
+
+# Chats kept in memory per chat setting, and how often (in seconds) to pick up settings changed by other bot processes (0 disables).
+SETTINGS_CACHE_SIZE = int(getenv("SETTINGS_CACHE_SIZE", "50000"))
+SETTINGS_POLL_INTERVAL = float(getenv("SETTINGS_POLL_INTERVAL", "5"))
+
+# Seconds between background refreshes of the figures shown in /stats.
+STATS_REFRESH_INTERVAL = int(getenv("STATS_REFRESH_INTERVAL", "60"))
+
+# Seconds between system metric samples, and how many samples to keep for the /stats sparklines.
+SYS_SAMPLE_INTERVAL = float(getenv("SYS_SAMPLE_INTERVAL", "5"))
+SYS_SAMPLE_HISTORY = int(getenv("SYS_SAMPLE_HISTORY", "60"))
+
+# New served users/chats are written in batches: seconds between writes, and how many pending ids trigger an early one.
+SERVED_FLUSH_INTERVAL = float(getenv("SERVED_FLUSH_INTERVAL", "10"))
+SERVED_BATCH_SIZE = int(getenv("SERVED_BATCH_SIZE", "500"))
+
+# Log Mongo commands that take longer than this many milliseconds.
+MONGO_SLOW_QUERY_MS = int(getenv("MONGO_SLOW_QUERY_MS", "100"))
+
 SONG_DOWNLOAD_DURATION = int(getenv("SONG_DOWNLOAD_DURATION_LIMIT", "180"))
 SONG_DOWNLOAD_DURATION_LIMIT = int(getenv("SONG_DOWNLOAD_DURATION_LIMIT", "2000"))
 
@@ -80,18 +175,32 @@ TG_VIDEO_FILESIZE_LIMIT = int(getenv("TG_VIDEO_FILESIZE_LIMIT", 2097152000))
 
 
 # Get your pyrogram v2 session from @BRANDEDSTRINGSESSION_BOT on Telegram
-STRING1 = getenv("STRING_SESSION",  None)
-STRING2 = getenv("STRING_SESSION2", None)
-STRING3 = getenv("STRING_SESSION3", None)
-STRING4 = getenv("STRING_SESSION4", None)
-STRING5 = getenv("STRING_SESSION5", None)
+# Every assistant session keyed by its number: STRING_SESSION is assistant 1 and STRING_SESSIONn is assistant n, with no upper limit.
+def _sessions() -> dict:
+    sessions = {}
+    for key, value in os.environ.items():
+        if not re.fullmatch(r"STRING_SESSION\d*", key) or not value:
+            continue
+        number = int(key[len("STRING_SESSION"):] or 1)
+        if number == 0:
+            raise SystemExit(
+                f"[ERROR] - {key} is not a valid assistant, numbering starts at STRING_SESSION (assistant 1)."
+            )
+        if number in sessions:
+            raise SystemExit(
+                f"[ERROR] - {key} and another STRING_SESSION variable both set assistant {number}, keep only one."
+            )
+        sessions[number] = value
+    return dict(sorted(sessions.items()))
+
+
+STRINGS = _sessions()
 
 LOG = 2
 BANNED_USERS = filters.user()
 adminlist = {}
 lyrical = {}
 votemode = {}
-autoclean = []
 confirmer = {}
 
 
@@ -9,21 +9,30 @@ from maythusharmusic import LOGGER, app, userbot
 from maythusharmusic.core.call import Hotty
 from maythusharmusic.misc import sudo
 from maythusharmusic.plugins import ALL_MODULES
-from maythusharmusic.utils.database import get_banned_users, get_gbanned
+from maythusharmusic.utils import perf
+from maythusharmusic.utils.database import (
+    get_banned_users,
+    get_gbanned,
+    served_chats,
+    served_users,
+    settings,
+)
+from maythusharmusic.utils.database.indexes import ensure_indexes
+from maythusharmusic.utils.http import http
+from maythusharmusic.utils.stream.journal import journal, restore
+from maythusharmusic.utils.sys import sampler
+from maythusharmusic.utils.watchdog import watchdog
 from config import BANNED_USERS
 
 
 async def init():
-    if (
-        not config.STRING1
-        and not config.STRING2
-        and not config.STRING3
-        and not config.STRING4
-        and not config.STRING5
-    ):
+    if not config.STRINGS:
         LOGGER(__name__).error("Assistant client variables not defined, exiting...")
         exit()
+    asyncio.create_task(ensure_indexes())
     await sudo()
+    await settings.load()
+    await asyncio.gather(served_users.start(), served_chats.start())
     try:
         users = await get_gbanned()
         for user_id in users:
@@ -33,6 +42,11 @@ async def init():
             BANNED_USERS.add(user_id)
     except:
         pass
+    watchdog.start()
+    sampler.start()
+    http.start()
+    if config.METRICS_PORT:
+        await perf.serve(config.METRICS_HOST, config.METRICS_PORT)
     await app.start()
     for all_module in ALL_MODULES:
         importlib.import_module("maythusharmusic.plugins" + all_module)
@@ -49,10 +63,14 @@ async def init():
     except:
         pass
     await Hotty.decorators()
+    await restore()
     LOGGER("maythusharmusic").info(
         "ᴅʀᴏᴘ ʏᴏᴜʀ ɢɪʀʟꜰʀɪᴇɴᴅ'ꜱ ɴᴜᴍʙᴇʀ ᴀᴛ @sasukevipmusicbotsupport ᴊᴏɪɴ @sasukevipmusicbot , @sasukevipmusicbotsupport ꜰᴏʀ ᴀɴʏ ɪꜱꜱᴜᴇꜱ"
     )
     await idle()
+    await journal.stop()
+    await asyncio.gather(served_users.flush(), served_chats.flush())
+    await http.close()
     await app.stop()
     await userbot.stop()
     LOGGER("maythusharmusic").info("Stopping Sasuke Music Bot...")
@@ -22,10 +22,12 @@ from pytgcalls.types.stream import StreamAudioEnded
 
 import config
 from maythusharmusic import LOGGER, YouTube, app
+from maythusharmusic.core.userbot import assistants
 from maythusharmusic.misc import db
 from maythusharmusic.utils.database import (
     add_active_chat,
     add_active_video_chat,
+    get_assistant_number,
     get_lang,
     get_loop,
     group_assistant,
@@ -37,10 +39,14 @@ from maythusharmusic.utils.database import (
     remove_active_video_chat,
     set_loop,
 )
+from maythusharmusic.utils.balancer import balancer
 from maythusharmusic.utils.exceptions import AssistantErr
 from maythusharmusic.utils.formatters import check_duration, seconds_to_min, speed_converter
 from maythusharmusic.utils.inline.play import stream_markup
-from maythusharmusic.utils.stream.autoclear import auto_clean
+from maythusharmusic.utils.perf import request, timed
+from maythusharmusic.utils.stream import prefetch
+from maythusharmusic.utils.stream.autoclear import adopt, auto_clean
+from maythusharmusic.utils.stream.tracks import TrackQueue
 from maythusharmusic.utils.thumbnails import get_thumb
 from strings import get_string
 
@@ -50,67 +56,33 @@ loop = asyncio.get_event_loop_policy().get_event_loop()
 
 
 async def _clear_(chat_id):
-    db[chat_id] = []
+    db[chat_id] = TrackQueue()
+    prefetch.cancel(chat_id)
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
 
 
 class Call(PyTgCalls):
     def __init__(self):
-        self.userbot1 = Client(
-            name="maythusharmusic1",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING1),
-        )
-        self.one = PyTgCalls(
-            self.userbot1,
-            cache_duration=100,
-        )
-        self.userbot2 = Client(
-            name="maythusharmusic2",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING2),
-        )
-        self.two = PyTgCalls(
-            self.userbot2,
-            cache_duration=100,
-        )
-        self.userbot3 = Client(
-            name="maythusharmusic3",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING3),
-        )
-        self.three = PyTgCalls(
-            self.userbot3,
-            cache_duration=100,
-        )
-        self.userbot4 = Client(
-            name="maythusharmusic4",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING4),
-        )
-        self.four = PyTgCalls(
-            self.userbot4,
-            cache_duration=100,
-        )
-        self.userbot5 = Client(
-            name="maythusharmusic5",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING5),
-        )
-        self.five = PyTgCalls(
-            self.userbot5,
-            cache_duration=100,
-        )
+        # Assistant number -> PyTgCalls instance driving that assistant's calls.
+        self.clients = {
+            number: PyTgCalls(
+                Client(
+                    name=f"maythusharmusic{number}",
+                    api_id=config.API_ID,
+                    api_hash=config.API_HASH,
+                    session_string=str(session),
+                ),
+                cache_duration=100,
+            )
+            for number, session in config.STRINGS.items()
+        }
 
     async def pause_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.pause_stream(chat_id)
+        if playing := db.get(chat_id):
+            playing[0].pause()
 
     async def mute_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
@@ -128,6 +100,8 @@ class Call(PyTgCalls):
     async def resume_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.resume_stream(chat_id)
+        if playing := db.get(chat_id):
+            playing[0].resume()
 
     async def stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
@@ -138,31 +112,10 @@ class Call(PyTgCalls):
             pass
 
     async def stop_stream_force(self, chat_id: int):
-        try:
-            if config.STRING1:
-                await self.one.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING2:
-                await self.two.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING3:
-                await self.three.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING4:
-                await self.four.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING5:
-                await self.five.leave_group_call(chat_id)
-        except:
-            pass
+        await asyncio.gather(
+            *(client.leave_group_call(chat_id) for client in self.clients.values()),
+            return_exceptions=True,
+        )
         try:
             await _clear_(chat_id)
         except:
@@ -325,6 +278,7 @@ class Call(PyTgCalls):
         await asyncio.sleep(0.2)
         await assistant.leave_group_call(config.LOGGER_ID)
 
+    @timed("call.join")
     async def join_call(
         self,
         chat_id: int,
@@ -366,10 +320,12 @@ class Call(PyTgCalls):
         except AlreadyJoinedError:
             raise AssistantErr(_["call_9"])
         except TelegramServerError:
+            balancer.failed(await get_assistant_number(chat_id))
             raise AssistantErr(_["call_10"])
         except Exception as e:
             if "phone.CreateGroupCall" in str(e):
                 raise AssistantErr(_["call_8"])
+            balancer.failed(await get_assistant_number(chat_id))
         await add_active_chat(chat_id)
         await music_on(chat_id)
         if video:
@@ -381,6 +337,10 @@ class Call(PyTgCalls):
                 autoend[chat_id] = datetime.now() + timedelta(minutes=1)
 
     async def change_stream(self, client, chat_id):
+        async with request("change_stream", str(chat_id)):
+            return await self._change_stream(client, chat_id)
+
+    async def _change_stream(self, client, chat_id):
         check = db.get(chat_id)
         popped = None
         loop = await get_loop(chat_id)
@@ -402,6 +362,7 @@ class Call(PyTgCalls):
                 return
         else:
             queued = check[0]["file"]
+            prefetch.schedule(chat_id)
             language = await get_lang(chat_id)
             _ = get_string(language)
             title = (check[0]["title"]).title()
@@ -460,16 +421,19 @@ class Call(PyTgCalls):
             elif "vid_" in queued:
                 mystic = await app.send_message(original_chat_id, _["call_7"])
                 try:
-                    file_path, direct = await YouTube.download(
-                        videoid,
-                        mystic,
-                        videoid=True,
-                        video=str(streamtype) == "video",
-                    )
+                    file_path = await prefetch.ready(chat_id, videoid, streamtype)
+                    if not file_path:
+                        file_path, direct = await YouTube.download(
+                            videoid,
+                            mystic,
+                            videoid=True,
+                            video=str(streamtype) == "video",
+                        )
                 except:
                     return await mystic.edit_text(
                         _["call_6"], disable_web_page_preview=True
                     )
+                adopt(db[chat_id][0], file_path)
                 if video:
                     stream = MediaStream(
                         file_path,
@@ -601,60 +565,38 @@ class Call(PyTgCalls):
                     db[chat_id][0]["markup"] = "stream"
 
     async def ping(self):
-        pings = []
-        if config.STRING1:
-            pings.append(await self.one.ping)
-        if config.STRING2:
-            pings.append(await self.two.ping)
-        if config.STRING3:
-            pings.append(await self.three.ping)
-        if config.STRING4:
-            pings.append(await self.four.ping)
-        if config.STRING5:
-            pings.append(await self.five.ping)
+        pings = [await self.clients[number].ping for number in assistants]
         return str(round(sum(pings) / len(pings), 3))
 
     async def start(self):
         LOGGER(__name__).info("Starting PyTgCalls Client...\n")
-        if config.STRING1:
-            await self.one.start()
-        if config.STRING2:
-            await self.two.start()
-        if config.STRING3:
-            await self.three.start()
-        if config.STRING4:
-            await self.four.start()
-        if config.STRING5:
-            await self.five.start()
+        numbers = list(self.clients)
+        results = await asyncio.gather(
+            *(self.clients[number].start() for number in numbers),
+            return_exceptions=True,
+        )
+        for number, result in zip(numbers, results):
+            if isinstance(result, Exception):
+                LOGGER(__name__).error(
+                    f"PyTgCalls for assistant {number} failed to start: {result}"
+                )
+                if number in assistants:
+                    assistants.remove(number)
 
     async def decorators(self):
-        @self.one.on_kicked()
-        @self.two.on_kicked()
-        @self.three.on_kicked()
-        @self.four.on_kicked()
-        @self.five.on_kicked()
-        @self.one.on_closed_voice_chat()
-        @self.two.on_closed_voice_chat()
-        @self.three.on_closed_voice_chat()
-        @self.four.on_closed_voice_chat()
-        @self.five.on_closed_voice_chat()
-        @self.one.on_left()
-        @self.two.on_left()
-        @self.three.on_left()
-        @self.four.on_left()
-        @self.five.on_left()
         async def stream_services_handler(_, chat_id: int):
             await self.stop_stream(chat_id)
 
-        @self.one.on_stream_end()
-        @self.two.on_stream_end()
-        @self.three.on_stream_end()
-        @self.four.on_stream_end()
-        @self.five.on_stream_end()
         async def stream_end_handler(client, update: Update):
             if not isinstance(update, StreamAudioEnded):
                 return
             await self.change_stream(client, update.chat_id)
 
+        for client in self.clients.values():
+            client.on_kicked()(stream_services_handler)
+            client.on_closed_voice_chat()(stream_services_handler)
+            client.on_left()(stream_services_handler)
+            client.on_stream_end()(stream_end_handler)
+
 
 Hotty = Call()
@@ -1,4 +1,5 @@
 import os
+import shutil
 
 from ..logging import LOGGER
 
@@ -16,5 +17,8 @@ def dirr():
         os.mkdir("downloads")
     if "cache" not in os.listdir():
         os.mkdir("cache")
+    for file in os.listdir("downloads"):
+        if file.startswith(".dl-"):
+            shutil.rmtree(os.path.join("downloads", file), ignore_errors=True)
 
     LOGGER(__name__).info("Directories Updated.")
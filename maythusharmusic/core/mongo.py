@@ -1,5 +1,8 @@
+import time
+from collections import deque
+
 from motor.motor_asyncio import AsyncIOMotorClient as _mongo_client_
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from pyrogram import Client
 
 import config
@@ -8,6 +11,87 @@ from ..logging import LOGGER
 
 TEMP_MONGODB = ""
 
+# Where each command keeps its filter, for the index audit.
+_FILTERS = {
+    "find": lambda command: [command.get("filter")],
+    "count": lambda command: [command.get("query")],
+    "findAndModify": lambda command: [command.get("query")],
+    "update": lambda command: [update.get("q") for update in command.get("updates", [])],
+    "delete": lambda command: [delete.get("q") for delete in command.get("deletes", [])],
+    "aggregate": lambda command: [
+        stage["$match"] for stage in command.get("pipeline", [])[:1] if "$match" in stage
+    ],
+}
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """Logs Mongo commands slower than a threshold and filters no index can serve.
+
+    `covered` maps a collection to the fields its indexes lead with; the
+    index manager fills it in. A filter whose leading field is not one of
+    them is reported once per shape as unindexed. The index manager also
+    checks the literal filters in the source, including ones that never ran.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.covered = {}
+        self.pending = {}
+        self.slow = deque(maxlen=50)
+        self.unindexed = set()
+        self.commands = 0
+        self.failures = 0
+
+    def _audit(self, collection, filters):
+        fields = self.covered.get(collection)
+        if fields is None:
+            return
+        for query in filters:
+            if not query:
+                continue
+            shape = tuple(query)
+            if shape[0] == "_id" or shape[0].startswith("$") or shape[0] in fields:
+                continue
+            if (collection, shape) not in self.unindexed:
+                self.unindexed.add((collection, shape))
+                LOGGER(__name__).warning(f"Unindexed query on {collection}: {shape}")
+
+    def started(self, event):
+        extract = _FILTERS.get(event.command_name)
+        if extract is None:
+            return
+        collection = event.command.get(event.command_name)
+        filters = extract(event.command)
+        self.pending[event.request_id] = (collection, filters)
+        self._audit(collection, filters)
+
+    def succeeded(self, event):
+        self.commands += 1
+        query = self.pending.pop(event.request_id, None)
+        seconds = event.duration_micros / 1e6
+        if query is None or seconds < self.threshold:
+            return
+        collection, filters = query
+        self.slow.append((time.time(), event.command_name, collection, seconds))
+        LOGGER(__name__).warning(
+            f"Slow {event.command_name} on {collection} took {seconds * 1000:.0f}ms: {filters}"
+        )
+
+    def failed(self, event):
+        self.failures += 1
+        self.pending.pop(event.request_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "commands": self.commands,
+            "failures": self.failures,
+            "slow": len(self.slow),
+            "unindexed": len(self.unindexed),
+        }
+
+
+profiler = QueryProfiler(config.MONGO_SLOW_QUERY_MS / 1000)
+
 
 if config.MONGO_DB_URI is None:
     LOGGER(__name__).warning("No MONGO DB URL found. LOL")
@@ -21,12 +105,12 @@ if config.MONGO_DB_URI is None:
     info = temp_client.get_me()
     username = info.username
     temp_client.stop()
-    _mongo_async_ = _mongo_client_(TEMP_MONGODB)
-    _mongo_sync_ = MongoClient(TEMP_MONGODB)
+    _mongo_async_ = _mongo_client_(TEMP_MONGODB, event_listeners=[profiler])
+    _mongo_sync_ = MongoClient(TEMP_MONGODB, event_listeners=[profiler])
     mongodb = _mongo_async_[username]
     pymongodb = _mongo_sync_[username]
 else:
-    _mongo_async_ = _mongo_client_(config.MONGO_DB_URI)
-    _mongo_sync_ = MongoClient(config.MONGO_DB_URI)
+    _mongo_async_ = _mongo_client_(config.MONGO_DB_URI, event_listeners=[profiler])
+    _mongo_sync_ = MongoClient(config.MONGO_DB_URI, event_listeners=[profiler])
     mongodb = _mongo_async_.maythusharmusic
     pymongodb = _mongo_sync_.maythusharmusic
@@ -1,10 +1,10 @@
 import re
 from typing import Union
 
-import aiohttp
-from bs4 import BeautifulSoup
 from youtubesearchpython.__future__ import VideosSearch
 
+from maythusharmusic.utils.meta import meta, meta_all
+
 
 class AppleAPI:
     def __init__(self):
@@ -20,16 +20,7 @@ class AppleAPI:
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        search = None
-        for tag in soup.find_all("meta"):
-            if tag.get("property", None) == "og:title":
-                search = tag.get("content", None)
+        search = (await meta(url, "og:title")).get("og:title")
         if search is None:
             return False
         results = VideosSearch(search, limit=1)
@@ -52,20 +43,14 @@ class AppleAPI:
         if playid:
             url = self.base + url
         playlist_id = url.split("playlist/")[1]
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        applelinks = soup.find_all("meta", attrs={"property": "music:song"})
+        applelinks = await meta_all(url, "music:song")
+        if applelinks is None:
+            return False
         results = []
         for item in applelinks:
             try:
-                xx = (((item["content"]).split("album/")[1]).split("/")[0]).replace(
-                    "-", " "
-                )
+                xx = ((item.split("album/")[1]).split("/")[0]).replace("-", " ")
             except:
-                xx = ((item["content"]).split("album/")[1]).split("/")[0]
+                xx = (item.split("album/")[1]).split("/")[0]
             results.append(xx)
         return results, playlist_id
@@ -1,9 +1,10 @@
 import random
 from os.path import realpath
 
-import aiohttp
 from aiohttp import client_exceptions
 
+from maythusharmusic.utils.http import http
+
 
 class UnableToFetchCarbon(Exception):
     pass
@@ -78,29 +79,26 @@ class CarbonAPI:
         self.watermark = False
 
     async def generate(self, text: str, user_id):
-        async with aiohttp.ClientSession(
-            headers={"Content-Type": "application/json"},
-        ) as ses:
-            params = {
-                "code": text,
-            }
-            params["backgroundColor"] = random.choice(colour)
-            params["theme"] = random.choice(themes)
-            params["dropShadow"] = self.drop_shadow
-            params["dropShadowOffsetY"] = self.drop_shadow_offset
-            params["dropShadowBlurRadius"] = self.drop_shadow_blur
-            params["fontFamily"] = self.font_family
-            params["language"] = self.language
-            params["watermark"] = self.watermark
-            params["widthAdjustment"] = self.width_adjustment
-            try:
-                request = await ses.post(
-                    "https://carbonara.solopov.dev/api/cook",
-                    json=params,
-                )
-            except client_exceptions.ClientConnectorError:
-                raise UnableToFetchCarbon("Can not reach the Host!")
-            resp = await request.read()
-            with open(f"cache/carbon{user_id}.jpg", "wb") as f:
-                f.write(resp)
-            return realpath(f.name)
+        params = {
+            "code": text,
+        }
+        params["backgroundColor"] = random.choice(colour)
+        params["theme"] = random.choice(themes)
+        params["dropShadow"] = self.drop_shadow
+        params["dropShadowOffsetY"] = self.drop_shadow_offset
+        params["dropShadowBlurRadius"] = self.drop_shadow_blur
+        params["fontFamily"] = self.font_family
+        params["language"] = self.language
+        params["watermark"] = self.watermark
+        params["widthAdjustment"] = self.width_adjustment
+        try:
+            request = await http.post(
+                "https://carbonara.solopov.dev/api/cook",
+                json=params,
+            )
+        except client_exceptions.ClientConnectorError:
+            raise UnableToFetchCarbon("Can not reach the Host!")
+        resp = await request.read()
+        with open(f"cache/carbon{user_id}.jpg", "wb") as f:
+            f.write(resp)
+        return realpath(f.name)
@@ -1,10 +1,10 @@
 import re
 from typing import Union
 
-import aiohttp
-from bs4 import BeautifulSoup
 from youtubesearchpython.__future__ import VideosSearch
 
+from maythusharmusic.utils.meta import meta
+
 
 class RessoAPI:
     def __init__(self):
@@ -20,22 +20,12 @@ class RessoAPI:
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        for tag in soup.find_all("meta"):
-            if tag.get("property", None) == "og:title":
-                title = tag.get("content", None)
-            if tag.get("property", None) == "og:description":
-                des = tag.get("content", None)
-                try:
-                    des = des.split("·")[0]
-                except:
-                    pass
-        if des == "":
+        tags = await meta(url, "og:title", "og:description")
+        if not tags:
+            return False
+        title = tags.get("og:title")
+        des = tags.get("og:description", "").split("·")[0]
+        if not title or des == "":
             return
         results = VideosSearch(title, limit=1)
         for result in (await results.next())["result"]:
@@ -2,7 +2,14 @@ from os import path
 
 from yt_dlp import YoutubeDL
 
+from maythusharmusic.utils.executor import run_blocking
 from maythusharmusic.utils.formatters import seconds_to_min
+from maythusharmusic.utils.stream.autoclear import media_cache
+
+
+def _extract(opts, url):
+    with YoutubeDL(opts) as ydl:
+        return ydl.extract_info(url)
 
 
 class SoundAPI:
@@ -22,12 +29,12 @@ class SoundAPI:
             return False
 
     async def download(self, url):
-        d = YoutubeDL(self.opts)
         try:
-            info = d.extract_info(url)
+            info = await run_blocking("soundcloud", _extract, self.opts, url)
         except:
             return False
         xyz = path.join("downloads", f"{info['id']}.{info['ext']}")
+        media_cache.record(xyz)
         duration_min = seconds_to_min(info["duration"])
         track_details = {
             "title": info["title"],
@@ -1,26 +1,46 @@
+import asyncio
 import re
+import time
 
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
+import aiohttp
 from youtubesearchpython.__future__ import VideosSearch
 
 import config
+from maythusharmusic.logging import LOGGER
+from maythusharmusic.utils.cache import AsyncTTLCache
+from maythusharmusic.utils.http import http
+
+API = "https://api.spotify.com/v1"
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+PAGE_SIZE = {"playlists": 100, "albums": 50}
+
+# (playlist id, snapshot id) or album id -> list of "track artist" strings.
+track_lists = AsyncTTLCache(maxsize=256, ttl=config.SPOTIFY_CACHE_TTL)
+
+
+class SpotifyError(Exception):
+    pass
+
+
+def _names(track: dict) -> str:
+    info = track["name"]
+    for artist in track["artists"]:
+        fetched = f' {artist["name"]}'
+        if "Various Artists" not in fetched:
+            info += fetched
+    return info
 
 
 class SpotifyAPI:
     def __init__(self):
         self.regex = r"^(https:\/\/open.spotify.com\/)(.*)$"
+        self.idreg = re.compile(r"(?:track|playlist|album|artist)[/:]([A-Za-z0-9]+)")
         self.client_id = config.SPOTIFY_CLIENT_ID
         self.client_secret = config.SPOTIFY_CLIENT_SECRET
-        if config.SPOTIFY_CLIENT_ID and config.SPOTIFY_CLIENT_SECRET:
-            self.client_credentials_manager = SpotifyClientCredentials(
-                self.client_id, self.client_secret
-            )
-            self.spotify = spotipy.Spotify(
-                client_credentials_manager=self.client_credentials_manager
-            )
-        else:
-            self.spotify = None
+        self.token = None
+        self.expires = 0.0
+        self.token_lock = None
+        self.pages = None
 
     async def valid(self, link: str):
         if re.search(self.regex, link):
@@ -28,13 +48,93 @@ class SpotifyAPI:
         else:
             return False
 
+    def _id(self, link: str) -> str:
+        match = self.idreg.search(link)
+        if match:
+            return match.group(1)
+        return link.split("?")[0].strip("/")
+
+    async def _token(self, refresh: bool = False) -> str:
+        if self.token_lock is None:
+            self.token_lock = asyncio.Lock()
+        async with self.token_lock:
+            if self.token and not refresh and time.monotonic() < self.expires:
+                return self.token
+            async with http.start().post(
+                TOKEN_URL,
+                data={"grant_type": "client_credentials"},
+                auth=aiohttp.BasicAuth(self.client_id, self.client_secret),
+            ) as response:
+                if response.status != 200:
+                    raise SpotifyError(f"token request failed: {response.status}")
+                data = await response.json()
+            self.token = data["access_token"]
+            # Renew a minute early so no request races the expiry.
+            self.expires = time.monotonic() + data.get("expires_in", 3600) - 60
+            return self.token
+
+    async def _get(self, path: str, **params) -> dict:
+        refreshed = False
+        for attempt in range(config.SPOTIFY_RETRIES + 1):
+            headers = {"Authorization": f"Bearer {await self._token()}"}
+            async with http.start().get(
+                f"{API}/{path}", params=params, headers=headers
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                if response.status == 401 and not refreshed:
+                    refreshed = True
+                    await self._token(refresh=True)
+                    continue
+                if response.status == 429 or response.status >= 500:
+                    try:
+                        delay = float(response.headers.get("Retry-After", 2**attempt))
+                    except ValueError:
+                        delay = 2**attempt
+                    if delay > config.SPOTIFY_MAX_RETRY_AFTER:
+                        # Better to fail the command now than leave the user waiting.
+                        raise SpotifyError(
+                            f"{path}: {response.status}, retry after {delay}s"
+                        )
+                    LOGGER(__name__).warning(
+                        f"Spotify returned {response.status} for {path}, retrying in {delay}s"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                raise SpotifyError(f"{path}: {response.status}")
+        raise SpotifyError(f"{path}: gave up after {config.SPOTIFY_RETRIES} retries")
+
+    async def _page(self, kind: str, item_id: str, offset: int) -> dict:
+        if self.pages is None:
+            self.pages = asyncio.Semaphore(config.SPOTIFY_PAGE_WORKERS)
+        params = {"offset": offset, "limit": PAGE_SIZE[kind]}
+        if kind == "playlists":
+            params["fields"] = "total,items(track(name,artists(name)))"
+        async with self.pages:
+            return await self._get(f"{kind}/{item_id}/tracks", **params)
+
+    async def _tracks(self, kind: str, item_id: str, first: dict) -> list:
+        """Every track of a playlist or album, fetching the remaining pages at once."""
+        size = PAGE_SIZE[kind]
+        pages = [first] + list(
+            await asyncio.gather(
+                *(
+                    self._page(kind, item_id, offset)
+                    for offset in range(size, first["total"], size)
+                )
+            )
+        )
+        results = []
+        for page in pages:
+            for item in page["items"]:
+                track = item.get("track", item)
+                if track and track.get("name"):
+                    results.append(_names(track))
+        return results
+
     async def track(self, link: str):
-        track = self.spotify.track(link)
-        info = track["name"]
-        for artist in track["artists"]:
-            fetched = f' {artist["name"]}'
-            if "Various Artists" not in fetched:
-                info += fetched
+        track = await self._get(f"tracks/{self._id(link)}")
+        info = _names(track)
         results = VideosSearch(info, limit=1)
         for result in (await results.next())["result"]:
             ytlink = result["link"]
@@ -52,47 +152,39 @@ class SpotifyAPI:
         return track_details, vidid
 
     async def playlist(self, url):
-        playlist = self.spotify.playlist(url)
-        playlist_id = playlist["id"]
-        results = []
-        for item in playlist["tracks"]["items"]:
-            music_track = item["track"]
-            info = music_track["name"]
-            for artist in music_track["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-        return results, playlist_id
+        playlist_id = self._id(url)
+        playlist = await self._get(
+            f"playlists/{playlist_id}",
+            fields="id,snapshot_id,tracks(total,items(track(name,artists(name))))",
+        )
+        # A playlist's snapshot id changes whenever its tracks do.
+        results = await track_lists.fetch(
+            ("playlist", playlist["id"], playlist["snapshot_id"]),
+            self._tracks,
+            "playlists",
+            playlist["id"],
+            playlist["tracks"],
+        )
+        return results, playlist["id"]
 
     async def album(self, url):
-        album = self.spotify.album(url)
-        album_id = album["id"]
-        results = []
-        for item in album["tracks"]["items"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
+        album_id = self._id(url)
+        cached = track_lists.get(("album", album_id))
+        if cached:
+            return cached, album_id
+        album = await self._get(f"albums/{album_id}")
+        results = await track_lists.fetch(
+            ("album", album["id"]), self._tracks, "albums", album["id"], album["tracks"]
+        )
         return (
             results,
-            album_id,
+            album["id"],
         )
 
     async def artist(self, url):
-        artistinfo = self.spotify.artist(url)
-        artist_id = artistinfo["id"]
-        results = []
-        artisttoptracks = self.spotify.artist_top_tracks(url)
-        for item in artisttoptracks["tracks"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
+        artist_id = self._id(url)
+        artisttoptracks = await self._get(
+            f"artists/{artist_id}/top-tracks", market="US"
+        )
+        results = [_names(item) for item in artisttoptracks["tracks"]]
         return results, artist_id
@@ -13,6 +13,7 @@ from maythusharmusic.utils.formatters import (
     get_readable_time,
     seconds_to_min,
 )
+from maythusharmusic.utils.stream.autoclear import media_cache
 
 
 class TeleAPI:
@@ -97,6 +98,7 @@ class TeleAPI:
         checker = [5, 10, 20, 40, 66, 80, 99]
         speed_counter = {}
         if os.path.exists(fname):
+            media_cache.record(fname)
             return True
 
         async def down_load():
@@ -173,4 +175,5 @@ class TeleAPI:
         if not verify:
             return False
         config.lyrical.pop(mystic.id)
+        media_cache.record(fname)
         return True
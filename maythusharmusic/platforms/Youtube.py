@@ -1,8 +1,9 @@
 import asyncio
-import glob
 import os
-import random
 import re
+import shutil
+import tempfile
+from collections import OrderedDict
 from typing import Union
 
 from pyrogram.enums import MessageEntityType
@@ -11,54 +12,21 @@ from youtubesearchpython.__future__ import VideosSearch
 from yt_dlp import YoutubeDL
 
 import config
+from maythusharmusic.utils.cache import AsyncTTLCache
+from maythusharmusic.utils.cookies import cookie_pool
 from maythusharmusic.utils.database import is_on_off
+from maythusharmusic.utils.extractor import ExtractorPool, ExtractorTimeout
 from maythusharmusic.utils.formatters import time_to_seconds
+from maythusharmusic.utils.perf import timed
+from maythusharmusic.utils.stream.autoclear import media_cache
 
-
-def cookies():
-    folder_path = f"{os.getcwd()}/cookies"
-    txt_files = glob.glob(os.path.join(folder_path, "*.txt"))
-    if not txt_files:
-        raise FileNotFoundError("No .txt files found in the specified folder.")
-    cookie_txt_file = random.choice(txt_files)
-    return f"""cookies/{str(cookie_txt_file).split("/")[-1]}"""
-
-
-def get_ytdl_options(ytdl_opts, commamdline=True) -> Union[str, dict, list]:
-    if commamdline:
-        if isinstance(ytdl_opts, list):
-            if os.getenv("TOKEN_ALLOW") == True:
-                ytdl_opts += ["--username", "oauth2", "--password", "''"]
-            else:
-                ytdl_opts += ["--cookies", cookies()]
-        elif isinstance(ytdl_opts, str):
-            if os.getenv("TOKEN_ALLOW") == True:
-                ytdl_opts += "--username oauth2 --password '' "
-            else:
-                ytdl_opts += f"--cookies {cookies()}"
-        elif isinstance(ytdl_opts, dict):
-            if os.getenv("TOKEN_ALLOW") == True:
-                ytdl_opts.update({"username": "oauth2", "password": ""})
-            else:
-                ytdl_opts["cookiefile"] = cookies()
-    else:
-        if isinstance(ytdl_opts, list):
-            if os.getenv("TOKEN_ALLOW") == True:
-                ytdl_opts += ["username", "oauth2", "password", "''"]
-            else:
-                ytdl_opts += ["cookiefile", cookies()]
-        elif isinstance(ytdl_opts, str):
-            if os.getenv("TOKEN_ALLOW") == True:
-                ytdl_opts += "username oauth2 password '' "
-            else:
-                ytdl_opts += f"cookiefile {cookies()}"
-        elif isinstance(ytdl_opts, dict):
-            if os.getenv("TOKEN_ALLOW") == True:
-                ytdl_opts.update({"username": "oauth2", "password": ""})
-            else:
-                ytdl_opts["cookiefile"] = cookies()
-
-    return ytdl_opts
+search_cache = AsyncTTLCache(
+    maxsize=config.YT_METADATA_CACHE_SIZE, ttl=config.YT_METADATA_CACHE_TTL
+)
+# Free-text track names (spotify, apple, resso imports) -> youtube video id.
+query_ids = AsyncTTLCache(
+    maxsize=config.YT_QUERY_CACHE_SIZE, ttl=config.YT_QUERY_CACHE_TTL
+)
 
 
 async def shell_cmd(cmd):
@@ -76,6 +44,122 @@ async def shell_cmd(cmd):
     return out.decode("utf-8")
 
 
+_common = {
+    "geo_bypass": True,
+    "nocheckcertificate": True,
+    "quiet": True,
+    "no_warnings": True,
+}
+
+YTDL_PROFILES = {
+    "audio": {
+        **_common,
+        "format": "bestaudio/best",
+        "outtmpl": "downloads/%(id)s.%(ext)s",
+    },
+    "video": {
+        **_common,
+        "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
+        "outtmpl": "downloads/%(id)s.%(ext)s",
+    },
+    "stream": {
+        "quiet": True,
+        "no_warnings": True,
+        "format": "best[height<=?720][width<=?1280]",
+    },
+    "formats": {"quiet": True},
+    "playlist": {
+        "quiet": True,
+        "no_warnings": True,
+        "ignoreerrors": True,
+        "extract_flat": "in_playlist",
+        "skip_download": True,
+        "compat_opts": {"no-youtube-unavailable-videos"},
+    },
+    "song_video": {
+        **_common,
+        "prefer_ffmpeg": True,
+        "merge_output_format": "mp4",
+    },
+    "song_audio": {
+        **_common,
+        "format": "bestaudio/best",
+        "outtmpl": "downloads/%(title)s.%(ext)s",
+        "prefer_ffmpeg": True,
+        "postprocessors": [
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": "opus",
+                "preferredquality": "320",
+            }
+        ],
+        "postprocessor_args": [
+            "-af', 'loudnorm=I=-16:LRA=11:TP=-1.5",  # Audio normalization
+            "-af', 'equalizer=f=1000:width_type=h:width=200:g=5",  # Equalizer (Bass/Treble boost)
+        ],
+    },
+}
+
+extractor = ExtractorPool(
+    YTDL_PROFILES,
+    cookie_pool,
+    workers=config.YTDL_WORKERS,
+    queue_size=config.YTDL_QUEUE_SIZE,
+    timeout=config.YTDL_TIMEOUT,
+)
+
+
+def _stream_url(worker, link):
+    info = worker.ydl("stream").extract_info(link, download=False)
+    if info.get("url"):
+        return info["url"]
+    return info["requested_formats"][0]["url"]
+
+
+def _playlist_ids(worker, link, limit):
+    ydl = worker.ydl("playlist")
+    ydl.params["playlistend"] = int(limit)
+    info = ydl.extract_info(link, download=False)
+    return [entry["id"] for entry in info.get("entries") or [] if entry and entry.get("id")]
+
+
+def _info(worker, link):
+    return worker.ydl("formats").extract_info(link, download=False)
+
+
+def _download(worker, profile, link, ratelimit=None):
+    ydl = worker.ydl(profile)
+    info = ydl.extract_info(link, download=False)
+    xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
+    if os.path.exists(xyz):
+        return xyz
+    # Download into a private directory and rename into place, so nobody
+    # ever sees a half-written file at the final path.
+    staging = tempfile.mkdtemp(prefix=".dl-", dir="downloads")
+    ydl.params["ratelimit"] = ratelimit
+    ydl.params["paths"] = {"home": staging}
+    try:
+        # Reuse the extracted info instead of letting download() extract again.
+        ydl.process_ie_result(info, download=True)
+        os.replace(os.path.join(staging, xyz), xyz)
+    finally:
+        ydl.params["ratelimit"] = None
+        ydl.params.pop("paths", None)
+        shutil.rmtree(staging, ignore_errors=True)
+    return xyz
+
+
+# (profile, video id) -> Task for downloads currently running
+downloading = {}
+# (profile, video id) -> number of callers that shared each recent download
+download_waiters = OrderedDict()
+
+
+def _song_download(worker, profile, link, extra=None):
+    with YoutubeDL(worker.options(profile, **(extra or {}))) as ydl:
+        ydl.download([link])
+
+
 class YouTubeAPI:
     def __init__(self):
         self.base = "https://www.youtube.com/watch?v="
@@ -83,6 +167,75 @@ class YouTubeAPI:
         self.status = "https://www.youtube.com/oembed?url="
         self.listbase = "https://youtube.com/playlist?list="
         self.reg = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+        self.idreg = re.compile(
+            r"(?:v=|youtu\.be/|shorts/|live/|embed/)([A-Za-z0-9_-]{11})"
+        )
+
+    def cache_key(self, link: str, limit: int) -> tuple:
+        match = self.idreg.search(link)
+        if match:
+            return "id", match.group(1), limit
+        return "q", " ".join(link.lower().split()), limit
+
+    async def _videos_search(self, link: str, limit: int) -> list:
+        results = VideosSearch(link, limit=limit)
+        return (await results.next())["result"]
+
+    async def search(
+        self, link: str, limit: int = 1, videoid: Union[bool, str] = None
+    ) -> list:
+        if videoid:
+            link = self.base + link
+        if "&" in link:
+            link = link.split("&")[0]
+        return await search_cache.fetch(
+            self.cache_key(link, limit), self._videos_search, link, limit
+        )
+
+    async def resolve(self, query: str) -> Union[str, None]:
+        """Map a link or free-text track name to a video id, remembering the answer."""
+        key = self.cache_key(query, 1)
+        if key[0] == "id":
+            return key[1]
+        return await query_ids.fetch(key[1], self._resolve, query)
+
+    async def _resolve(self, query: str):
+        results = await self.search(query)
+        if not results:
+            return None
+        vidid = results[0]["id"]
+        # Seed the id entry so the follow-up details() lookup is free.
+        search_cache.set(self.cache_key(self.base + vidid, 1), results[:1])
+        return vidid
+
+    async def shared_download(self, profile: str, link: str, ratelimit: int = None):
+        match = self.idreg.search(link)
+        key = (profile, match.group(1) if match else link)
+        task = downloading.get(key)
+        if task is None:
+            # Stays registered until the worker is done with the file, even
+            # after callers time out, so a retry joins it instead of racing it.
+            task = asyncio.ensure_future(
+                self._download_job(profile, link, ratelimit)
+            )
+            downloading[key] = task
+            task.add_done_callback(lambda _: downloading.pop(key, None))
+            download_waiters[key] = 1
+            download_waiters.move_to_end(key)
+            while len(download_waiters) > 512:
+                download_waiters.popitem(last=False)
+        else:
+            download_waiters[key] = download_waiters.get(key, 1) + 1
+        timeout = config.YTDL_DOWNLOAD_TIMEOUT or None
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            extractor.timeouts += 1
+            raise ExtractorTimeout(f"yt-dlp download timed out after {timeout}s")
+
+    async def _download_job(self, profile: str, link: str, ratelimit: int = None):
+        job = await extractor.submit(_download, profile, link, ratelimit)
+        return await job
 
     async def exists(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
@@ -121,8 +274,7 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
+        for result in await self.search(link):
             title = result["title"]
             duration_min = result["duration"]
             thumbnail = result["thumbnails"][0]["url"].split("?")[0]
@@ -138,8 +290,7 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
+        for result in await self.search(link):
             title = result["title"]
         return title
 
@@ -148,8 +299,7 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
+        for result in await self.search(link):
             duration = result["duration"]
         return duration
 
@@ -158,8 +308,7 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
+        for result in await self.search(link):
             thumbnail = result["thumbnails"][0]["url"].split("?")[0]
         return thumbnail
 
@@ -168,52 +317,29 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        cmd = [
-            "yt-dlp",
-            "-g",
-            "-f",
-            "best[height<=?720][width<=?1280]",
-            f"{link}",
-        ]
-        cmd = get_ytdl_options(cmd)
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-        if stdout:
-            return 1, stdout.decode().split("\n")[0]
-        else:
-            return 0, stderr.decode()
+        try:
+            return 1, await extractor.run(_stream_url, link)
+        except Exception as e:
+            return 0, str(e)
 
     async def playlist(self, link, limit, user_id, videoid: Union[bool, str] = None):
         if videoid:
             link = self.listbase + link
         if "&" in link:
             link = link.split("&")[0]
-
-        cmd = (
-            f"yt-dlp -i --compat-options no-youtube-unavailable-videos "
-            f'--get-id --flat-playlist --playlist-end {limit} --skip-download "{link}" '
-            f"2>/dev/null"
-        )
-
-        playlist = await shell_cmd(cmd)
-
         try:
-            result = [key for key in playlist.split("\n") if key]
+            result = await extractor.run(_playlist_ids, link, limit)
         except:
             result = []
         return result
 
+    @timed("youtube.track")
     async def track(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
+        for result in await self.search(link):
             title = result["title"]
             duration_min = result["duration"]
             vidid = result["id"]
@@ -234,39 +360,32 @@ class YouTubeAPI:
         if "&" in link:
             link = link.split("&")[0]
 
-        ytdl_opts = {
-            "quiet": True,
-        }
-        ytdl_opts = get_ytdl_options(ytdl_opts, False)
-
-        ydl = YoutubeDL(ytdl_opts)
-        with ydl:
-            formats_available = []
-            r = ydl.extract_info(link, download=False)
-            for format in r["formats"]:
+        formats_available = []
+        r = await extractor.run(_info, link)
+        for format in r["formats"]:
+            try:
+                str(format["format"])
+            except Exception:
+                continue
+            if "dash" not in str(format["format"]).lower():
                 try:
-                    str(format["format"])
-                except Exception:
+                    format["format"]
+                    format["filesize"]
+                    format["format_id"]
+                    format["ext"]
+                    format["format_note"]
+                except KeyError:
                     continue
-                if "dash" not in str(format["format"]).lower():
-                    try:
-                        format["format"]
-                        format["filesize"]
-                        format["format_id"]
-                        format["ext"]
-                        format["format_note"]
-                    except KeyError:
-                        continue
-                    formats_available.append(
-                        {
-                            "format": format["format"],
-                            "filesize": format["filesize"],
-                            "format_id": format["format_id"],
-                            "ext": format["ext"],
-                            "format_note": format["format_note"],
-                            "yturl": link,
-                        }
-                    )
+                formats_available.append(
+                    {
+                        "format": format["format"],
+                        "filesize": format["filesize"],
+                        "format_id": format["format_id"],
+                        "ext": format["ext"],
+                        "format_note": format["format_note"],
+                        "yturl": link,
+                    }
+                )
         return formats_available, link
 
     async def slider(
@@ -279,14 +398,14 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        a = VideosSearch(link, limit=10)
-        result = (await a.next()).get("result")
+        result = await self.search(link, limit=10)
         title = result[query_type]["title"]
         duration_min = result[query_type]["duration"]
         vidid = result[query_type]["id"]
         thumbnail = result[query_type]["thumbnails"][0]["url"].split("?")[0]
         return title, duration_min, thumbnail, vidid
 
+    @timed("youtube.download")
     async def download(
         self,
         link: str,
@@ -297,129 +416,37 @@ class YouTubeAPI:
         songvideo: Union[bool, str] = None,
         format_id: Union[bool, str] = None,
         title: Union[bool, str] = None,
+        ratelimit: int = None,
     ) -> str:
         if videoid:
             link = self.base + link
-        loop = asyncio.get_running_loop()
-
-        def audio_dl():
-            ydl_optssx = {
-                "format": "bestaudio/best",
-                "outtmpl": "downloads/%(id)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-            }
-            ydl_optssx = get_ytdl_options(ydl_optssx, False)
-
-            x = YoutubeDL(ydl_optssx)
-            info = x.extract_info(link, False)
-            xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
-            if os.path.exists(xyz):
-                return xyz
-            x.download([link])
-            return xyz
-
-        def video_dl():
-            ydl_optssx = {
-                "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
-                "outtmpl": "downloads/%(id)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-            }
-            ydl_optssx = get_ytdl_options(ydl_optssx, False)
-
-            x = YoutubeDL(ydl_optssx)
-            info = x.extract_info(link, False)
-            xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
-            if os.path.exists(xyz):
-                return xyz
-            x.download([link])
-            return xyz
-
-        def song_video_dl():
-            formats = f"{format_id}+140"
-            fpath = f"downloads/{title}"
-            ydl_optssx = {
-                "format": formats,
-                "outtmpl": fpath,
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "prefer_ffmpeg": True,
-                "merge_output_format": "mp4",
-            }
-            ydl_optssx = get_ytdl_options(ydl_optssx, False)
-
-            x = YoutubeDL(ydl_optssx)
-            x.download([link])
-
-        def song_audio_dl():
-            ydl_opts = {
-                "format": "bestaudio/best",
-                "outtmpl": "downloads/%(title)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "prefer_ffmpeg": True,
-                "postprocessors": [
-                    {
-                        "key": "FFmpegExtractAudio",
-                        "preferredcodec": "opus",
-                        "preferredquality": "320",
-                    }
-                ],
-               "postprocessor_args": [
-                   "-af', 'loudnorm=I=-16:LRA=11:TP=-1.5",  # Audio normalization
-                   "-af', 'equalizer=f=1000:width_type=h:width=200:g=5",  # Equalizer (Bass/Treble boost)
-                ],
-            }
-            ydl_optssx = get_ytdl_options(ydl_optssx, False)
-
-            x = YoutubeDL(ydl_optssx)
-            x.download([link])
-
         if songvideo:
-            await loop.run_in_executor(None, song_video_dl)
+            await extractor.run(
+                _song_download,
+                "song_video",
+                link,
+                {"format": f"{format_id}+140", "outtmpl": f"downloads/{title}"},
+            )
             fpath = f"downloads/{title}.mp4"
             return fpath
         elif songaudio:
-            await loop.run_in_executor(None, song_audio_dl)
+            await extractor.run(_song_download, "song_audio", link)
             fpath = f"downloads/{title}.mp3"
             return fpath
         elif video:
             if await is_on_off(config.YTDOWNLOADER):
                 direct = True
-                downloaded_file = await loop.run_in_executor(None, video_dl)
+                downloaded_file = await self.shared_download("video", link, ratelimit)
             else:
-                command = [
-                    "yt-dlp",
-                    "-g",
-                    "-f",
-                    "best[height<=?720][width<=?1280]",
-                ]
-                command += get_ytdl_options([])
-                command.append(link)
-
-                proc = await asyncio.create_subprocess_exec(
-                    *command,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                stdout, stderr = await proc.communicate()
-
-                if stdout:
-                    downloaded_file = stdout.decode().split("\n")[0]
+                try:
+                    downloaded_file = await extractor.run(_stream_url, link)
                     direct = None
-                else:
+                except Exception:
                     return
         else:
             direct = True
-            downloaded_file = await loop.run_in_executor(None, audio_dl)
+            downloaded_file = await self.shared_download("audio", link, ratelimit)
+        if direct:
+            media_cache.record(downloaded_file)
 
         return downloaded_file, direct
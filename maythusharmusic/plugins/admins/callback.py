@@ -1,5 +1,3 @@
-import asyncio
-
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
@@ -7,8 +5,6 @@ from maythusharmusic import YouTube, app
 from maythusharmusic.core.call import Hotty
 from maythusharmusic.misc import SUDOERS, db
 from maythusharmusic.utils.database import (
-    get_active_chats,
-    get_lang,
     get_upvote_count,
     is_active_chat,
     is_music_playing,
@@ -18,9 +14,10 @@ from maythusharmusic.utils.database import (
     set_loop,
 )
 from maythusharmusic.utils.decorators.language import languageCB
-from maythusharmusic.utils.formatters import seconds_to_min
-from maythusharmusic.utils.inline import close_markup, stream_markup, stream_markup_timer
-from maythusharmusic.utils.stream.autoclear import auto_clean
+from maythusharmusic.utils.inline import close_markup, stream_markup
+from maythusharmusic.utils.stream import prefetch
+from maythusharmusic.utils.stream.autoclear import adopt, auto_clean
+from maythusharmusic.utils.stream.progress import progress
 from maythusharmusic.utils.thumbnails import get_thumb
 from config import (
     BANNED_USERS,
@@ -33,9 +30,7 @@ from config import (
     confirmer,
     votemode,
 )
-from strings import get_string
 
-checker = {}
 upvoters = {}
 
 
@@ -198,6 +193,7 @@ async def del_back_playlist(client, CallbackQuery, _):
             txt = f"➻ sᴛʀᴇᴀᴍ ʀᴇ-ᴘʟᴀʏᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
         await CallbackQuery.answer()
         queued = check[0]["file"]
+        prefetch.schedule(chat_id)
         title = (check[0]["title"]).title()
         user = check[0]["by"]
         duration = check[0]["dur"]
@@ -246,14 +242,17 @@ async def del_back_playlist(client, CallbackQuery, _):
                 _["call_7"], disable_web_page_preview=True
             )
             try:
-                file_path, direct = await YouTube.download(
-                    videoid,
-                    mystic,
-                    videoid=True,
-                    video=status,
-                )
+                file_path = await prefetch.ready(chat_id, videoid, streamtype)
+                if not file_path:
+                    file_path, direct = await YouTube.download(
+                        videoid,
+                        mystic,
+                        videoid=True,
+                        video=status,
+                    )
             except:
                 return await mystic.edit_text(_["call_6"])
+            adopt(db[chat_id][0], file_path)
             try:
                 image = await YouTube.thumbnail(videoid, True)
             except:
@@ -350,48 +349,4 @@ async def del_back_playlist(client, CallbackQuery, _):
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
 
 
-async def markup_timer():
-    while not await asyncio.sleep(7):
-        active_chats = await get_active_chats()
-        for chat_id in active_chats:
-            try:
-                if not await is_music_playing(chat_id):
-                    continue
-                playing = db.get(chat_id)
-                if not playing:
-                    continue
-                duration_seconds = int(playing[0]["seconds"])
-                if duration_seconds == 0:
-                    continue
-                try:
-                    mystic = playing[0]["mystic"]
-                except:
-                    continue
-                try:
-                    check = checker[chat_id][mystic.id]
-                    if check is False:
-                        continue
-                except:
-                    pass
-                try:
-                    language = await get_lang(chat_id)
-                    _ = get_string(language)
-                except:
-                    _ = get_string("en")
-                try:
-                    buttons = stream_markup_timer(
-                        _,
-                        chat_id,
-                        seconds_to_min(playing[0]["played"]),
-                        playing[0]["dur"],
-                    )
-                    await mystic.edit_reply_markup(
-                        reply_markup=InlineKeyboardMarkup(buttons)
-                    )
-                except:
-                    continue
-            except:
-                continue
-
-
-asyncio.create_task(markup_timer())
+progress.start()
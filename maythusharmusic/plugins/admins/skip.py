@@ -8,7 +8,8 @@ from maythusharmusic.misc import db
 from maythusharmusic.utils.database import get_loop
 from maythusharmusic.utils.decorators import AdminRightsCheck
 from maythusharmusic.utils.inline import close_markup, stream_markup
-from maythusharmusic.utils.stream.autoclear import auto_clean
+from maythusharmusic.utils.stream import prefetch
+from maythusharmusic.utils.stream.autoclear import adopt, auto_clean
 from maythusharmusic.utils.thumbnails import get_thumb
 from config import BANNED_USERS
 
@@ -90,6 +91,7 @@ async def skip(cli, message: Message, _, chat_id):
             except:
                 return
     queued = check[0]["file"]
+    prefetch.schedule(chat_id)
     title = (check[0]["title"]).title()
     user = check[0]["by"]
     streamtype = check[0]["streamtype"]
@@ -131,14 +133,17 @@ async def skip(cli, message: Message, _, chat_id):
     elif "vid_" in queued:
         mystic = await message.reply_text(_["call_7"], disable_web_page_preview=True)
         try:
-            file_path, direct = await YouTube.download(
-                videoid,
-                mystic,
-                videoid=True,
-                video=status,
-            )
+            file_path = await prefetch.ready(chat_id, videoid, streamtype)
+            if not file_path:
+                file_path, direct = await YouTube.download(
+                    videoid,
+                    mystic,
+                    videoid=True,
+                    video=status,
+                )
         except:
             return await mystic.edit_text(_["call_6"])
+        adopt(db[chat_id][0], file_path)
         try:
             image = await YouTube.thumbnail(videoid, True)
         except:
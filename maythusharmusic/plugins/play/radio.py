@@ -48,7 +48,7 @@ async def radio(client, message: Message):
     msg = await message.reply_text("ᴘʟᴇᴀsᴇ ᴡᴀɪᴛ ᴀ ᴍᴏᴍᴇɴᴛ....")
     try:
         try:
-            userbot = await get_assistant(message.chat.id)
+            userbot = await get_assistant(message.chat.id, rebalance=True)
             get = await app.get_chat_member(message.chat.id, userbot.id)
         except ChatAdminRequired:
             return await msg.edit_text(
@@ -0,0 +1,69 @@
+from pyrogram import filters
+from pyrogram.types import Message
+
+from maythusharmusic import app
+from maythusharmusic.core.mongo import profiler
+from maythusharmusic.misc import SUDOERS
+from maythusharmusic.platforms.Youtube import downloading, extractor, search_cache
+from maythusharmusic.utils import perf
+from maythusharmusic.utils.balancer import balancer
+from maythusharmusic.utils.database import served_chats, served_users, settings
+from maythusharmusic.utils.executor import executors
+from maythusharmusic.utils.http import http
+from maythusharmusic.utils.stream import prefetch
+from maythusharmusic.utils.stream.autoclear import media_cache
+from maythusharmusic.utils.stream.progress import progress
+from maythusharmusic.utils.sys import sampler
+from maythusharmusic.utils.thumbnails import thumb_cache
+from maythusharmusic.utils.watchdog import watchdog
+
+perf.register("search_cache", search_cache.stats)
+perf.register("media_cache", media_cache.stats)
+perf.register("thumb_cache", thumb_cache.stats)
+perf.register("extractor", extractor.stats)
+perf.register("downloads", lambda: {"inflight": len(downloading)})
+perf.register("prefetch", lambda: prefetch.stats)
+perf.register("progress", progress.stats)
+perf.register("loop", watchdog.stats)
+perf.register("http", http.stats)
+perf.register("assistants", balancer.stats)
+perf.register("settings", settings.stats)
+perf.register("served_users", served_users.stats)
+perf.register("served_chats", served_chats.stats)
+perf.register("system", sampler.stats)
+perf.register("mongo", profiler.stats)
+for name, executor in executors.items():
+    perf.register(f"executor_{name}", executor.stats)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}"
+
+
+@app.on_message(filters.command(["perf"]) & SUDOERS)
+async def perf_stats(client, message: Message):
+    text = "**Stage latency (ms)** `p50 / p95 / p99 · count`\n\n"
+    for stage, histogram in sorted(perf.stages.items()):
+        p50, p95, p99 = histogram.percentiles(0.5, 0.95, 0.99)
+        text += f"`{stage}` {_ms(p50)} / {_ms(p95)} / {_ms(p99)} · {histogram.count}\n"
+    slowest = perf.slowest(5)
+    if slowest:
+        text += "\n**Slowest recent requests**\n\n"
+        for record in slowest:
+            stages = ", ".join(
+                f"{stage} {_ms(seconds)}" for stage, seconds in record["stages"][:4]
+            )
+            text += f"{_ms(record['total'])} ms `{record['label'] or record['kind']}`\n"
+            if stages:
+                text += f"  ↳ {stages}\n"
+    loop = watchdog.stats()
+    text += (
+        f"\n**Event loop** stalls: {loop['stalls']} | "
+        f"max lag: {_ms(loop['max_lag'])} ms\n"
+    )
+    pool = http.stats()
+    text += (
+        f"**HTTP** requests: {pool['requests']} | new connections: {pool['connections']} | "
+        f"reused: {pool['reused']} ({pool['reuse_ratio']:.0%})\n"
+    )
+    await message.reply_text(text)
@@ -5,10 +5,11 @@ from yt_dlp import YoutubeDL
 
 from maythusharmusic import app
 from maythusharmusic.misc import SUDOERS
+from maythusharmusic.utils.cookies import cookie_pool
 
 
 async def check_cookies(video_url):
-    cookie_file = get_random_cookie()
+    cookie_file = cookie_pool.pick()
     opts = {
         "format": "bestaudio",
         "quiet": True,
@@ -17,8 +18,10 @@ async def check_cookies(video_url):
     try:
         with YoutubeDL(opts) as ytdl:
             ytdl.extract_info(video_url, download=False)
+        cookie_pool.report(cookie_file)
         return True
-    except:
+    except Exception as e:
+        cookie_pool.report(cookie_file, e)
         return False
 
 
@@ -50,6 +53,24 @@ async def cookies_status(client, message):
     await status_msg.edit_text(status_message)
 
 
+@app.on_message(filters.command("cookiestats") & SUDOERS)
+async def cookies_stats(client, message):
+    stats = cookie_pool.stats()
+    if not stats:
+        return await message.reply_text("**No cookie files found.**")
+    text = "**Cookie Health:**\n\n"
+    for cookie in stats:
+        state = (
+            f"⏳ {cookie['quarantined']}s" if cookie["quarantined"] else "✅ Ready"
+        )
+        text += (
+            f"`{cookie['path']}` {state}\n"
+            f"ok: {cookie['success']} | failed: {cookie['failure']} | "
+            f"429: {cookie['rate_limited']} | weight: {cookie['weight']}\n\n"
+        )
+    await message.reply_text(text)
+
+
 @app.on_message(filters.command("authtoken") & SUDOERS)
 async def auth_token_status(client, message):
     status_message = "**Auth Token Status:**\nChecking..."
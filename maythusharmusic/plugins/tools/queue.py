@@ -2,19 +2,21 @@ import asyncio
 import os
 
 from pyrogram import filters
-from pyrogram.errors import FloodWait
 from pyrogram.types import CallbackQuery, InputMediaPhoto, Message
 
 import config
 from maythusharmusic import app
 from maythusharmusic.misc import db
 from maythusharmusic.utils import HottyBin, get_channeplayCB, seconds_to_min
-from maythusharmusic.utils.database import get_cmode, is_active_chat, is_music_playing
+from maythusharmusic.utils.database import get_cmode, is_active_chat
 from maythusharmusic.utils.decorators.language import language, languageCB
 from maythusharmusic.utils.inline import queue_back_markup, queue_markup
+from maythusharmusic.utils.stream.progress import progress
 from config import BANNED_USERS
 
 basic = {}
+# Tracks shown per page of the queue list.
+PAGE_SIZE = 5
 
 
 def get_image(videoid):
@@ -35,6 +37,23 @@ def get_duration(playing):
         return "Inline"
 
 
+def queue_timer(_, chat_id, videoid, DUR, cplay):
+    def render():
+        playing = db.get(chat_id)
+        if not playing or playing[0]["vidid"] != videoid or not basic.get(videoid):
+            return None
+        return queue_markup(
+            _,
+            DUR,
+            cplay,
+            videoid,
+            seconds_to_min(playing[0]["played"]),
+            playing[0]["dur"],
+        )
+
+    return render
+
+
 @app.on_message(
     filters.command(["queue", "cqueue", "player", "cplayer", "playing", "cplaying"])
     & filters.group
@@ -99,32 +118,9 @@ async def get_queue(client, message: Message, _):
     basic[videoid] = True
     mystic = await message.reply_photo(IMAGE, caption=cap, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    "c" if cplay else "g",
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+        progress.watch(
+            mystic, queue_timer(_, chat_id, videoid, DUR, "c" if cplay else "g"), 5
+        )
 
 
 @app.on_callback_query(filters.regex("GetTimer") & ~BANNED_USERS)
@@ -140,7 +136,7 @@ async def quite_timer(client, CallbackQuery: CallbackQuery):
 async def queued_tracks(client, CallbackQuery: CallbackQuery, _):
     callback_data = CallbackQuery.data.strip()
     callback_request = callback_data.split(None, 1)[1]
-    what, videoid = callback_request.split("|")
+    what, videoid, *page = callback_request.split("|")
     try:
         chat_id, channel = await get_channeplayCB(_, what, CallbackQuery)
     except:
@@ -154,34 +150,29 @@ async def queued_tracks(client, CallbackQuery: CallbackQuery, _):
         return await CallbackQuery.answer(_["queue_5"], show_alert=True)
     await CallbackQuery.answer()
     basic[videoid] = False
-    buttons = queue_back_markup(_, what)
+    pages = -(-len(got) // PAGE_SIZE)
+    page = int(page[0]) % pages if page else 0
+    buttons = queue_back_markup(_, what, videoid, page, pages)
     med = InputMediaPhoto(
         media="https://te.legra.ph/file/ba39a10ba20736f42f202.jpg",
         caption=_["queue_1"],
     )
     await CallbackQuery.edit_message_media(media=med)
-    j = 0
     msg = ""
-    for x in got:
-        j += 1
-        if j == 1:
+    for j, x in enumerate(got.page(page * PAGE_SIZE, PAGE_SIZE), page * PAGE_SIZE):
+        if j == 0:
             msg += f'Streaming :\n\n✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
-        elif j == 2:
+        elif j == 1:
             msg += f'Queued :\n\n✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
         else:
             msg += f'✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
-    if "Queued" in msg:
-        if len(msg) < 700:
-            await asyncio.sleep(1)
-            return await CallbackQuery.edit_message_text(msg, reply_markup=buttons)
-        if "✨" in msg:
-            msg = msg.replace("✨", "")
-        link = await HottyBin(msg)
-        med = InputMediaPhoto(media=link, caption=_["queue_3"].format(link))
-        await CallbackQuery.edit_message_media(media=med, reply_markup=buttons)
-    else:
+    if len(msg) < 700:
         await asyncio.sleep(1)
         return await CallbackQuery.edit_message_text(msg, reply_markup=buttons)
+    msg = msg.replace("✨", "")
+    link = await HottyBin(msg)
+    med = InputMediaPhoto(media=link, caption=_["queue_3"].format(link))
+    await CallbackQuery.edit_message_media(media=med, reply_markup=buttons)
 
 
 @app.on_callback_query(filters.regex("queue_back_timer") & ~BANNED_USERS)
@@ -241,29 +232,4 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
     med = InputMediaPhoto(media=IMAGE, caption=cap)
     mystic = await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    cplay,
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+        progress.watch(mystic, queue_timer(_, chat_id, videoid, DUR, cplay), 5)
@@ -1,7 +1,6 @@
 import platform
 from sys import version as pyver
 
-import psutil
 from pyrogram import __version__ as pyrover
 from pyrogram import filters
 from pyrogram.errors import MessageIdInvalid
@@ -11,11 +10,13 @@ from pytgcalls.__version__ import __version__ as pytgver
 import config
 from maythusharmusic import app
 from maythusharmusic.core.userbot import assistants
-from maythusharmusic.misc import SUDOERS, mongodb
+from maythusharmusic.misc import SUDOERS
 from maythusharmusic.plugins import ALL_MODULES
-from maythusharmusic.utils.database import get_served_chats, get_served_users, get_sudoers, get_queries
+from maythusharmusic.utils.balancer import balancer
+from maythusharmusic.utils.database import get_sudoers, stats_snapshot
 from maythusharmusic.utils.decorators.language import language, languageCB
 from maythusharmusic.utils.inline.stats import back_stats_buttons, stats_buttons
+from maythusharmusic.utils.sys import sampler
 from config import BANNED_USERS
 
 
@@ -50,16 +51,14 @@ async def overall_stats(client, CallbackQuery, _):
     except:
         pass
     await CallbackQuery.edit_message_text(_["gstats_1"].format(app.mention))
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
-    total_queries = await get_queries()
+    snapshot = await stats_snapshot.get()
     text = _["gstats_3"].format(
         app.mention,
         len(assistants),
         len(BANNED_USERS),
-        served_chats,
-        served_users,
-        total_queries,
+        snapshot["served_chats"],
+        snapshot["served_users"],
+        snapshot["queries"],
         len(ALL_MODULES),
         len(SUDOERS),
         config.AUTO_LEAVING_ASSISTANT,
@@ -85,26 +84,24 @@ async def bot_stats(client, CallbackQuery, _):
     except:
         pass
     await CallbackQuery.edit_message_text(_["gstats_1"].format(app.mention))
-    p_core = psutil.cpu_count(logical=False)
-    t_core = psutil.cpu_count(logical=True)
-    ram = str(round(psutil.virtual_memory().total / (1024.0**3))) + " ɢʙ"
-    try:
-        cpu_freq = psutil.cpu_freq().current
-        if cpu_freq >= 1000:
-            cpu_freq = f"{round(cpu_freq / 1000, 2)}ɢʜᴢ"
-        else:
-            cpu_freq = f"{round(cpu_freq, 2)}ᴍʜᴢ"
-    except:
+    sample = sampler.latest()
+    p_core = sampler.info["physical_cores"]
+    t_core = sampler.info["logical_cores"]
+    ram = str(round(sampler.info["ram_total"] / (1024.0**3))) + " ɢʙ"
+    cpu_freq = sample["cpu_freq"]
+    if not cpu_freq:
         cpu_freq = "ғᴀɪʟᴇᴅ ᴛᴏ ғᴇᴛᴄʜ"
-    hdd = psutil.disk_usage("/")
-    total = hdd.total / (1024.0**3)
-    used = hdd.used / (1024.0**3)
-    free = hdd.free / (1024.0**3)
-    call = await mongodb.command("dbstats")
+    elif cpu_freq >= 1000:
+        cpu_freq = f"{round(cpu_freq / 1000, 2)}ɢʜᴢ"
+    else:
+        cpu_freq = f"{round(cpu_freq, 2)}ᴍʜᴢ"
+    total = sample["disk_total"] / (1024.0**3)
+    used = sample["disk_used"] / (1024.0**3)
+    free = sample["disk_free"] / (1024.0**3)
+    snapshot = await stats_snapshot.get()
+    call = snapshot["dbstats"]
     datasize = call["dataSize"] / 1024
     storage = call["storageSize"] / 1024
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
     text = _["gstats_5"].format(
         app.mention,
         len(ALL_MODULES),
@@ -119,8 +116,8 @@ async def bot_stats(client, CallbackQuery, _):
         str(total)[:4],
         str(used)[:4],
         str(free)[:4],
-        served_chats,
-        served_users,
+        snapshot["served_chats"],
+        snapshot["served_users"],
         len(BANNED_USERS),
         len(await get_sudoers()),
         str(datasize)[:6],
@@ -128,6 +125,17 @@ async def bot_stats(client, CallbackQuery, _):
         call["collections"],
         call["objects"],
     )
+    text += (
+        f"\n\nᴄᴘᴜ {sampler.sparkline('cpu', top=100)} {sample['cpu']}%"
+        f"\nʀᴀᴍ {sampler.sparkline('ram', top=100)} {sample['ram']}%"
+        f"\nʀss {sample['rss'] / 1024**2:.0f} ᴍʙ · ғᴅs {sample['fds']} · ғғᴍᴘᴇɢ {sample['ffmpeg']}"
+        f"\nɴᴇᴛ ↑{sample['net_sent'] / 1024:.0f} ↓{sample['net_recv'] / 1024:.0f} ᴋʙ/s"
+    )
+    for row in balancer.report():
+        text += (
+            f"\nᴀssɪsᴛᴀɴᴛ {row['assistant']}: {row['calls']} calls ({row['video']} video)"
+            f" · load {row['load']:g}{'' if row['healthy'] else ' · unhealthy'}"
+        )
     med = InputMediaPhoto(media=config.STATS_IMG_URL, caption=text)
     try:
         await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
@@ -135,3 +143,6 @@ async def bot_stats(client, CallbackQuery, _):
         await CallbackQuery.message.reply_photo(
             photo=config.STATS_IMG_URL, caption=text, reply_markup=upl
         )
+
+
+stats_snapshot.start()
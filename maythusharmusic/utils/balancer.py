@@ -0,0 +1,137 @@
+import random
+import time
+from collections import deque
+
+import config
+
+
+class AssistantBalancer:
+    """Chooses which assistant a chat is placed on.
+
+    An assistant's load is its number of active calls, with video calls
+    counted as `video_weight` since encoding them is what costs CPU. A chat
+    placed by pick() counts as one call on its assistant until its call
+    starts, or for PENDING_SECONDS if it never does, so a burst of /play
+    commands is spread out. An assistant whose calls failed `error_limit`
+    times within `error_window` seconds is skipped until those failures age
+    out.
+    """
+
+    PENDING_SECONDS = 60
+
+    def __init__(
+        self,
+        video_weight: float = 3,
+        error_limit: int = 3,
+        error_window: float = 300,
+        margin: float = 2,
+    ):
+        self.video_weight = video_weight
+        self.error_limit = error_limit
+        self.error_window = error_window
+        self.margin = margin
+        self.errors = {}
+        self.pending = {}
+        self.placed = 0
+        self.moved = 0
+
+    def failed(self, assistant):
+        if assistant is None:
+            return
+        recent = self.errors.get(int(assistant))
+        if recent is None:
+            recent = self.errors[int(assistant)] = deque(maxlen=self.error_limit)
+        recent.append(time.monotonic())
+
+    def healthy(self, assistant) -> bool:
+        recent = self.errors.get(int(assistant))
+        if not recent or len(recent) < self.error_limit:
+            return True
+        return time.monotonic() - recent[0] > self.error_window
+
+    def loads(self) -> dict:
+        from maythusharmusic.core.userbot import assistants
+        from maythusharmusic.utils.database import active, activevideo, assistantdict
+
+        loads = {assistant: 0 for assistant in assistants}
+        video = set(activevideo)
+        for chat_id in active:
+            assistant = assistantdict.get(chat_id)
+            if assistant in loads:
+                loads[assistant] += self.video_weight if chat_id in video else 1
+        now = time.monotonic()
+        for chat_id, (assistant, placed_at) in list(self.pending.items()):
+            if chat_id in active or now - placed_at > self.PENDING_SECONDS:
+                del self.pending[chat_id]
+            elif assistant in loads:
+                loads[assistant] += 1
+        return loads
+
+    def pick(self, chat_id=None) -> int:
+        """The least-loaded healthy assistant; ties are broken at random."""
+        loads = self.loads()
+        candidates = [assistant for assistant in loads if self.healthy(assistant)]
+        candidates = candidates or list(loads)
+        lowest = min(loads[assistant] for assistant in candidates)
+        self.placed += 1
+        assistant = random.choice(
+            [assistant for assistant in candidates if loads[assistant] == lowest]
+        )
+        if chat_id is not None:
+            self.pending[chat_id] = (assistant, time.monotonic())
+        return assistant
+
+    def should_move(self, assistant) -> bool:
+        """Whether an idle chat on this assistant is better placed elsewhere."""
+        loads = self.loads()
+        if assistant not in loads:
+            return True
+        healthy = [other for other in loads if self.healthy(other)]
+        if not healthy:
+            return False
+        if assistant not in healthy:
+            return True
+        lowest = min(loads[other] for other in healthy)
+        return loads[assistant] - lowest >= self.margin
+
+    def report(self) -> list:
+        from maythusharmusic.utils.database import active, activevideo, assistantdict
+
+        video = set(activevideo)
+        rows = []
+        for assistant, load in sorted(self.loads().items()):
+            chats = [chat for chat in active if assistantdict.get(chat) == assistant]
+            recent = self.errors.get(assistant, ())
+            rows.append(
+                {
+                    "assistant": assistant,
+                    "calls": len(chats),
+                    "video": sum(1 for chat in chats if chat in video),
+                    "load": load,
+                    "errors": sum(
+                        1 for at in recent if time.monotonic() - at <= self.error_window
+                    ),
+                    "healthy": self.healthy(assistant),
+                }
+            )
+        return rows
+
+    def stats(self) -> dict:
+        stats = {
+            "placed": self.placed,
+            "moved": self.moved,
+            "pending": len(self.pending),
+        }
+        for row in self.report():
+            stats[f"assistant_{row['assistant']}_calls"] = row["calls"]
+            stats[f"assistant_{row['assistant']}_load"] = row["load"]
+            stats[f"assistant_{row['assistant']}_errors"] = row["errors"]
+        return stats
+
+
+balancer = AssistantBalancer(
+    config.ASSISTANT_VIDEO_WEIGHT,
+    config.ASSISTANT_ERROR_LIMIT,
+    config.ASSISTANT_ERROR_WINDOW,
+    config.ASSISTANT_REBALANCE_MARGIN,
+)
@@ -0,0 +1,301 @@
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict
+
+
+class AsyncTTLCache:
+    """LRU cache with per-entry TTL that coalesces concurrent lookups of a key."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self._lookup(key) is not _MISSING
+
+    def _lookup(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        if value is _MISSING:
+            return default
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    async def fetch(self, key, func, *args, **kwargs):
+        value = self._lookup(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+        self.misses += 1
+        task = asyncio.ensure_future(func(*args, **kwargs))
+        self._inflight[key] = task
+
+        def _done(t):
+            self._inflight.pop(key, None)
+            if t.cancelled() or t.exception() is not None:
+                return
+            # Empty results are never stored so a transient failure isn't pinned.
+            if t.result():
+                self.set(key, t.result())
+
+        task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
+
+
+_MISSING = object()
+
+
+class DiskCache:
+    """Size-capped directory of cached files, evicted least-recently-used first."""
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._index = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._scan()
+
+    def _scan(self):
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(".part"):
+                os.remove(entry.path)
+                continue
+            if not entry.name.endswith(self.suffix):
+                continue
+            stat = entry.stat()
+            key = entry.name[: len(entry.name) - len(self.suffix)]
+            found.append((stat.st_mtime, key, stat.st_size))
+        for _, key, size in sorted(found):
+            self._index[key] = size
+            self.size += size
+        self._evict()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def get(self, key: str):
+        path = self.path(key)
+        if key in self._index and os.path.isfile(path):
+            self._index.move_to_end(key)
+            self.hits += 1
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+        self.size -= self._index.pop(key, 0)
+        self.misses += 1
+        return None
+
+    def add(self, key: str) -> str:
+        path = self.path(key)
+        self.size -= self._index.pop(key, 0)
+        size = os.path.getsize(path)
+        self._index[key] = size
+        self.size += size
+        self._evict()
+        return path
+
+    def _evict(self):
+        while self.size > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self._index),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class MediaCache:
+    """Byte-budgeted index of downloaded media that never evicts pinned files.
+
+    Files are pinned while they sit in a queue. A freshly recorded download
+    is held until the queue pins it, or for HOLD_SECONDS if it never gets
+    there. Unpinned files are kept until the budget is exceeded, then
+    evicted by recency ("lru") or by use count with recency as the
+    tie-break ("lfu").
+    """
+
+    TEMP_SUFFIXES = (".part", ".ytdl", ".temp", ".tmp")
+    HOLD_SECONDS = 600
+
+    def __init__(self, directory: str, max_bytes: int, policy: str = "lru"):
+        self.directory = os.path.realpath(directory)
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._files = {}
+        self._pins = Counter()
+        self._held = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._scan()
+
+    def owns(self, path) -> bool:
+        return os.path.realpath(str(path)).startswith(self.directory + os.sep)
+
+    def _scan(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name.endswith(self.TEMP_SUFFIXES):
+                continue
+            stat = entry.stat()
+            self._files[entry.path] = [stat.st_size, 1, stat.st_mtime]
+            self.size += stat.st_size
+        self._evict()
+
+    def _add(self, key: str):
+        size = os.path.getsize(key)
+        self._files[key] = [size, 1, time.time()]
+        self.size += size
+
+    def record(self, path) -> bool:
+        """Account for a lookup that resolved to path and hold it until it is queued.
+
+        Returns True on a cache hit.
+        """
+        key = os.path.realpath(str(path))
+        if not self.owns(key) or not os.path.isfile(key):
+            return False
+        entry = self._files.get(key)
+        if entry:
+            self.hits += 1
+            entry[1] += 1
+            entry[2] = time.time()
+        else:
+            self.misses += 1
+            self._add(key)
+        self._held[key] = time.monotonic()
+        self._evict()
+        return entry is not None
+
+    def pin(self, path):
+        key = os.path.realpath(str(path))
+        if not self.owns(key):
+            return
+        # Files from other sources (Telegram, SoundCloud) are indexed here.
+        if key not in self._files and os.path.isfile(key):
+            self._add(key)
+        self._held.pop(key, None)
+        self._pins[key] += 1
+
+    def unpin(self, path):
+        key = os.path.realpath(str(path))
+        if key not in self._pins:
+            return
+        self._pins[key] -= 1
+        if self._pins[key] <= 0:
+            del self._pins[key]
+            self._evict()
+
+    def pinned(self, path) -> bool:
+        return os.path.realpath(str(path)) in self._pins
+
+    def _evict(self):
+        if self.size <= self.max_bytes:
+            return
+        now = time.monotonic()
+        for key, held_at in list(self._held.items()):
+            if now - held_at > self.HOLD_SECONDS:
+                del self._held[key]
+        candidates = [
+            key
+            for key in self._files
+            if key not in self._pins and key not in self._held
+        ]
+        if self.policy == "lfu":
+            candidates.sort(key=lambda key: (self._files[key][1], self._files[key][2]))
+        else:
+            candidates.sort(key=lambda key: self._files[key][2])
+        for key in candidates:
+            if self.size <= self.max_bytes:
+                break
+            size = self._files.pop(key)[0]
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.remove(key)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self._files),
+            "pinned": len(self._pins),
+            "held": len(self._held),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
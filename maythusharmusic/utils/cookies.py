@@ -0,0 +1,158 @@
+import glob
+import os
+import random
+import threading
+import time
+
+from maythusharmusic.logging import LOGGER
+
+RATE_LIMIT_MARKERS = ("429", "too many requests")
+AUTH_MARKERS = (
+    "sign in to confirm",
+    "not a bot",
+    "cookies are no longer valid",
+    "login required",
+    "use --cookies",
+)
+
+
+class CookieHealth:
+    __slots__ = (
+        "path",
+        "success",
+        "failure",
+        "rate_limited",
+        "streak",
+        "quarantined_until",
+        "last_used",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self.success = 0
+        self.failure = 0
+        self.rate_limited = 0
+        self.streak = 0
+        self.quarantined_until = 0.0
+        self.last_used = 0.0
+
+    @property
+    def weight(self) -> float:
+        # Laplace-smoothed success rate, with 429s counting double against a cookie.
+        total = self.success + self.failure + self.rate_limited
+        return (self.success + 1) / (total + self.rate_limited + 2)
+
+
+class CookiePool:
+    """Indexes the cookies/ folder once and hands out weighted, health-aware picks."""
+
+    def __init__(
+        self,
+        folder: str = "cookies",
+        rescan_interval: float = 30,
+        backoff: float = 60,
+        max_backoff: float = 3600,
+    ):
+        self.folder = folder
+        self.rescan_interval = rescan_interval
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cookies = {}
+        self._lock = threading.Lock()
+        self._dir_mtime = None
+        self._checked = 0.0
+
+    def refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._checked < self.rescan_interval:
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self.folder).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if not force and mtime == self._dir_mtime:
+            return
+        self._dir_mtime = mtime
+        found = {
+            f"{self.folder}/{os.path.basename(path)}"
+            for path in glob.glob(os.path.join(self.folder, "*.txt"))
+        }
+        for path in found - self.cookies.keys():
+            self.cookies[path] = CookieHealth(path)
+        for path in self.cookies.keys() - found:
+            del self.cookies[path]
+        LOGGER(__name__).info(f"Indexed {len(self.cookies)} cookie files.")
+
+    def pick(self) -> str:
+        with self._lock:
+            self.refresh()
+            if not self.cookies:
+                raise FileNotFoundError("No .txt files found in the specified folder.")
+            now = time.monotonic()
+            healthy = [
+                cookie
+                for cookie in self.cookies.values()
+                if cookie.quarantined_until <= now
+            ]
+            if healthy:
+                cookie = random.choices(
+                    healthy, weights=[cookie.weight for cookie in healthy]
+                )[0]
+            else:
+                cookie = min(
+                    self.cookies.values(), key=lambda c: c.quarantined_until
+                )
+            cookie.last_used = now
+            return cookie.path
+
+    def usable(self, path: str) -> bool:
+        cookie = self.cookies.get(path)
+        return cookie is not None and cookie.quarantined_until <= time.monotonic()
+
+    def report(self, path: str, error: BaseException = None) -> bool:
+        """Record the outcome of a job that used this cookie.
+
+        Returns True when the cookie was blamed for the error and quarantined.
+        """
+        with self._lock:
+            cookie = self.cookies.get(path)
+            if cookie is None:
+                return False
+            if error is None:
+                cookie.success += 1
+                cookie.streak = 0
+                return False
+            text = str(error).lower()
+            if any(marker in text for marker in RATE_LIMIT_MARKERS):
+                cookie.rate_limited += 1
+            elif any(marker in text for marker in AUTH_MARKERS):
+                cookie.failure += 1
+            else:
+                return False
+            cookie.streak += 1
+            delay = min(self.backoff * 2 ** (cookie.streak - 1), self.max_backoff)
+            cookie.quarantined_until = time.monotonic() + delay
+            LOGGER(__name__).warning(
+                f"Quarantined {path} for {int(delay)}s after: {str(error)[:120]}"
+            )
+            return True
+
+    def stats(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            self.refresh()
+            return [
+                {
+                    "path": cookie.path,
+                    "success": cookie.success,
+                    "failure": cookie.failure,
+                    "rate_limited": cookie.rate_limited,
+                    "weight": round(cookie.weight, 3),
+                    "quarantined": max(0, int(cookie.quarantined_until - now)),
+                }
+                for cookie in sorted(self.cookies.values(), key=lambda c: c.path)
+            ]
+
+
+cookie_pool = CookiePool()
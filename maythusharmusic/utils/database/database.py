@@ -1,8 +1,15 @@
-import random
-from typing import Dict, List, Union
+import asyncio
+from collections import OrderedDict
+from typing import Callable, Dict, List, Union
 
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+import config
 from maythusharmusic import userbot
 from maythusharmusic.core.mongo import mongodb, pymongodb
+from maythusharmusic.logging import LOGGER
+from maythusharmusic.utils.balancer import balancer
 
 authdb = mongodb.adminauth
 authuserdb = mongodb.authuser
@@ -11,8 +18,10 @@ assdb = mongodb.assistants
 blacklist_chatdb = mongodb.blacklistChat
 blockeddb = mongodb.blockedusers
 chatsdb = mongodb.chats
+chattopdb = mongodb.chatstats
 channeldb = mongodb.cplaymode
 countdb = mongodb.upcount
+countersdb = mongodb.counters
 gbansdb = mongodb.gban
 langdb = mongodb.language
 onoffdb = mongodb.onoffper
@@ -25,6 +34,7 @@ privatedb = mongodb.privatechats
 suggdb = mongodb.suggestion
 cleandb = mongodb.cleanmode
 queriesdb = mongodb.queries
+settingsdb = mongodb.settingsversion
 userdb = mongodb.userstats
 videodb = mongodb.vipvideocalls
 chatsdbc = mongodb.chatsc  # for clone
@@ -35,16 +45,8 @@ active = []
 activevideo = []
 assistantdict = {}
 autoend = {}
-count = {}
-channelconnect = {}
-langm = {}
 loop = {}
-maintenance = []
-nonadmin = {}
 pause = {}
-playmode = {}
-playtype = {}
-skipmode = {}
 privatechats = {}
 cleanmode = []
 suggestion = {}
@@ -52,6 +54,223 @@ mute = {}
 audio = {}
 video = {}
 
+
+class Setting:
+    """One per-chat setting held in memory in front of its collection.
+
+    With a `field`, the value is that field of the chat's document. Without
+    one, the setting is whether the document exists: `present` when it does,
+    `default` when it doesn't. Chats missing from the collection are cached
+    with the default too, so each chat costs at most one find_one until it
+    is evicted from the LRU of `maxsize` entries.
+    """
+
+    def __init__(self, collection, field=None, default=None, present=True, key="chat_id"):
+        self.collection = collection
+        self.field = field
+        self.default = default
+        self.present = present
+        self.key = key
+        self.maxsize = config.SETTINGS_CACHE_SIZE
+        self.values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _value(self, document):
+        if document is None:
+            return self.default
+        if self.field is None:
+            return self.present
+        return document.get(self.field, self.default)
+
+    def _store(self, chat_id, value):
+        self.values[chat_id] = value
+        self.values.move_to_end(chat_id)
+        while len(self.values) > self.maxsize:
+            self.values.popitem(last=False)
+
+    def evict(self, chat_id):
+        self.values.pop(chat_id, None)
+
+    async def get(self, chat_id):
+        if chat_id in self.values:
+            self.hits += 1
+            self.values.move_to_end(chat_id)
+            return self.values[chat_id]
+        self.misses += 1
+        value = self._value(await self.collection.find_one({self.key: chat_id}))
+        self._store(chat_id, value)
+        return value
+
+    async def set(self, chat_id, value):
+        self._store(chat_id, value)
+        if self.field is not None:
+            await self.collection.update_one(
+                {self.key: chat_id}, {"$set": {self.field: value}}, upsert=True
+            )
+        elif value == self.present:
+            await self.collection.update_one(
+                {self.key: chat_id}, {"$set": {self.key: chat_id}}, upsert=True
+            )
+        else:
+            await self.collection.delete_many({self.key: chat_id})
+
+    async def load(self):
+        projection = {"_id": 0, self.key: 1}
+        if self.field is not None:
+            projection[self.field] = 1
+        async for document in self.collection.find({}, projection).limit(self.maxsize):
+            if self.key in document:
+                self._store(document[self.key], self._value(document))
+
+
+class SettingsCache:
+    """Keeps every Setting coherent across bot processes sharing one database.
+
+    Each write bumps a version stamp in Mongo and appends (setting, chat) to
+    a short change log in the same update. Every process polls the stamp and
+    evicts the chats changed since its last poll, or everything if it fell
+    further behind than the log reaches.
+    """
+
+    CHANGES = 200
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self.__dict__.update(settings)
+        self.version = None
+        self.task = None
+
+    async def set(self, name: str, chat_id, value):
+        await self.settings[name].set(chat_id, value)
+        await settingsdb.update_one(
+            {"_id": "settings"},
+            {
+                "$inc": {"version": 1},
+                "$push": {"changes": {"$each": [[name, chat_id]], "$slice": -self.CHANGES}},
+            },
+            upsert=True,
+        )
+
+    async def _sync(self):
+        document = await settingsdb.find_one({"_id": "settings"}) or {}
+        version = document.get("version", 0)
+        changes = document.get("changes", [])
+        if self.version is not None and version != self.version:
+            missed = version - self.version
+            if 0 < missed <= len(changes):
+                for name, chat_id in changes[-missed:]:
+                    if name in self.settings:
+                        self.settings[name].evict(chat_id)
+            else:
+                for setting in self.settings.values():
+                    setting.values.clear()
+        self.version = version
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(config.SETTINGS_POLL_INTERVAL)
+            try:
+                await self._sync()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Settings sync failed: {e}")
+
+    async def load(self):
+        # Read the stamp first so writes racing the bulk load are evicted later.
+        await self._sync()
+        await asyncio.gather(*(setting.load() for setting in self.settings.values()))
+        if config.SETTINGS_POLL_INTERVAL and self.task is None:
+            self.task = asyncio.create_task(self._poll())
+
+    def stats(self) -> dict:
+        stats = {"version": self.version or 0}
+        for name, setting in self.settings.items():
+            stats[f"{name}_size"] = len(setting.values)
+            stats[f"{name}_hits"] = setting.hits
+            stats[f"{name}_misses"] = setting.misses
+        return stats
+
+
+settings = SettingsCache(
+    lang=Setting(langdb, "lang", "my"),
+    playmode=Setting(playmodedb, "mode", "Direct"),
+    playtype=Setting(playtypedb, "mode", "Everyone"),
+    cmode=Setting(channeldb, "mode"),
+    upvotes=Setting(countdb, "mode", 5),
+    nonadmin=Setting(authdb, default=False),
+    skipmode=Setting(skipdb, default=True, present=False),
+    onoff=Setting(onoffdb, default=False, key="on_off"),
+)
+
+# Maintained document counts, so /stats never has to scan a collection.
+
+
+async def _counter(name: str, collection, query: dict) -> int:
+    counter = await countersdb.find_one({"_id": name})
+    if counter is not None:
+        return counter["count"]
+    # First use: create the counter before counting it, so that a write racing
+    # the seed is bumped onto the counter and then covered by the $set below,
+    # instead of being bumped onto nothing and lost.
+    result = await countersdb.update_one(
+        {"_id": name}, {"$setOnInsert": {"count": 0}}, upsert=True
+    )
+    if result.upserted_id is None:
+        counter = await countersdb.find_one({"_id": name})
+        return counter["count"]
+    value = await collection.count_documents(query)
+    await countersdb.update_one({"_id": name}, {"$set": {"count": value}})
+    return value
+
+
+async def _bump(name: str, amount: int):
+    # Never upserts, so an unseeded counter is left for _counter to seed.
+    await countersdb.update_one({"_id": name}, {"$inc": {"count": amount}})
+
+
+class StatsSnapshot:
+    """The figures /stats shows, refreshed in the background every `interval` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.values = {}
+        self.task = None
+        self.lock = asyncio.Lock()
+
+    async def refresh(self) -> dict:
+        async with self.lock:
+            served_chats, served_users, queries, dbstats = await asyncio.gather(
+                get_served_chats_count(),
+                get_served_users_count(),
+                get_queries(),
+                mongodb.command("dbstats"),
+            )
+            self.values = {
+                "served_chats": served_chats,
+                "served_users": served_users,
+                "queries": queries,
+                "dbstats": dbstats,
+            }
+            return self.values
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Stats refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._loop())
+
+    async def get(self) -> dict:
+        return self.values or await self.refresh()
+
+
+stats_snapshot = StatsSnapshot(config.STATS_REFRESH_INTERVAL)
+
 # Total Queries on bot
 
 
@@ -76,34 +295,42 @@ async def set_queries(mode: int):
 # Top Chats DB
 
 
+def _spot_total() -> dict:
+    """Server-side sum of the positive play counts in a document's vidid map."""
+    items = {"$objectToArray": {"$ifNull": ["$vidid", {}]}}
+    items = {"$filter": {"input": items, "as": "i", "cond": {"$gt": ["$$i.v.spot", 0]}}}
+    return {"$sum": {"$map": {"input": items, "as": "i", "in": "$$i.v.spot"}}}
+
+
 async def get_top_chats() -> dict:
     results = {}
-    async for chat in chattopdb.find({"chat_id": {"$lt": 0}}):
-        chat_id = chat["chat_id"]
-        total = 0
-        for i in chat["vidid"]:
-            counts_ = chat["vidid"][i]["spot"]
-            if counts_ > 0:
-                total += counts_
-                results[chat_id] = total
+    pipeline = [
+        {"$match": {"chat_id": {"$lt": 0}}},
+        {"$project": {"_id": 0, "chat_id": 1, "total": _spot_total()}},
+        {"$match": {"total": {"$gt": 0}}},
+    ]
+    async for chat in chattopdb.aggregate(pipeline):
+        results[chat["chat_id"]] = chat["total"]
     return results
 
 
 async def get_global_tops() -> dict:
     results = {}
-    async for chat in chattopdb.find({"chat_id": {"$lt": 0}}):
-        for i in chat["vidid"]:
-            counts_ = chat["vidid"][i]["spot"]
-            title_ = chat["vidid"][i]["title"]
-            if counts_ > 0:
-                if i not in results:
-                    results[i] = {}
-                    results[i]["spot"] = counts_
-                    results[i]["title"] = title_
-                else:
-                    spot = results[i]["spot"]
-                    count_ = spot + counts_
-                    results[i]["spot"] = count_
+    pipeline = [
+        {"$match": {"chat_id": {"$lt": 0}}},
+        {"$project": {"_id": 0, "items": {"$objectToArray": "$vidid"}}},
+        {"$unwind": "$items"},
+        {"$match": {"items.v.spot": {"$gt": 0}}},
+        {
+            "$group": {
+                "_id": "$items.k",
+                "spot": {"$sum": "$items.v.spot"},
+                "title": {"$first": "$items.v.title"},
+            }
+        },
+    ]
+    async for track in chattopdb.aggregate(pipeline, allowDiskUse=True):
+        results[track["_id"]] = {"spot": track["spot"], "title": track["title"]}
     return results
 
 
@@ -152,14 +379,12 @@ async def update_user_top(chat_id: int, name: str, vidid: dict):
 
 async def get_topp_users() -> dict:
     results = {}
-    async for chat in userdb.find({"chat_id": {"$gt": 0}}):
-        user_id = chat["chat_id"]
-        total = 0
-        for i in chat["vidid"]:
-            counts_ = chat["vidid"][i]["spot"]
-            if counts_ > 0:
-                total += counts_
-        results[user_id] = total
+    pipeline = [
+        {"$match": {"chat_id": {"$gt": 0}}},
+        {"$project": {"_id": 0, "chat_id": 1, "total": _spot_total()}},
+    ]
+    async for user in userdb.aggregate(pipeline):
+        results[user["chat_id"]] = user["total"]
     return results
 
 
@@ -169,16 +394,7 @@ async def get_assistant_number(chat_id: int) -> str:
 
 
 async def get_client(assistant: int):
-    if int(assistant) == 1:
-        return userbot.one
-    elif int(assistant) == 2:
-        return userbot.two
-    elif int(assistant) == 3:
-        return userbot.three
-    elif int(assistant) == 4:
-        return userbot.four
-    elif int(assistant) == 5:
-        return userbot.five
+    return userbot.clients.get(int(assistant))
 
 
 async def set_assistant_new(chat_id, number):
@@ -191,9 +407,7 @@ async def set_assistant_new(chat_id, number):
 
 
 async def set_assistant(chat_id):
-    from maythusharmusic.core.userbot import assistants
-
-    ran_assistant = random.choice(assistants)
+    ran_assistant = balancer.pick(chat_id)
     assistantdict[chat_id] = ran_assistant
     await assdb.update_one(
         {"chat_id": chat_id},
@@ -204,10 +418,15 @@ async def set_assistant(chat_id):
     return userbot
 
 
-async def get_assistant(chat_id: int) -> str:
+async def get_assistant(chat_id: int, rebalance: bool = False) -> str:
     from maythusharmusic.core.userbot import assistants
 
     assistant = assistantdict.get(chat_id)
+    # Only idle chats move; the caller is expected to make the new assistant join.
+    if rebalance and assistant and chat_id not in active:
+        if balancer.should_move(assistant):
+            balancer.moved += 1
+            return await set_assistant(chat_id)
     if not assistant:
         dbassistant = await assdb.find_one({"chat_id": chat_id})
         if not dbassistant:
@@ -232,9 +451,7 @@ async def get_assistant(chat_id: int) -> str:
 
 
 async def set_calls_assistant(chat_id):
-    from maythusharmusic.core.userbot import assistants
-
-    ran_assistant = random.choice(assistants)
+    ran_assistant = balancer.pick(chat_id)
     assistantdict[chat_id] = ran_assistant
     await assdb.update_one(
         {"chat_id": chat_id},
@@ -264,60 +481,27 @@ async def group_assistant(self, chat_id: int) -> int:
             assis = assistant
         else:
             assis = await set_calls_assistant(chat_id)
-    if int(assis) == 1:
-        return self.one
-    elif int(assis) == 2:
-        return self.two
-    elif int(assis) == 3:
-        return self.three
-    elif int(assis) == 4:
-        return self.four
-    elif int(assis) == 5:
-        return self.five
+    return self.clients.get(int(assis))
 
 
 async def is_skipmode(chat_id: int) -> bool:
-    mode = skipmode.get(chat_id)
-    if not mode:
-        user = await skipdb.find_one({"chat_id": chat_id})
-        if not user:
-            skipmode[chat_id] = True
-            return True
-        skipmode[chat_id] = False
-        return False
-    return mode
+    return await settings.skipmode.get(chat_id)
 
 
 async def skip_on(chat_id: int):
-    skipmode[chat_id] = True
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if user:
-        return await skipdb.delete_one({"chat_id": chat_id})
+    await settings.set("skipmode", chat_id, True)
 
 
 async def skip_off(chat_id: int):
-    skipmode[chat_id] = False
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if not user:
-        return await skipdb.insert_one({"chat_id": chat_id})
+    await settings.set("skipmode", chat_id, False)
 
 
 async def get_upvote_count(chat_id: int) -> int:
-    mode = count.get(chat_id)
-    if not mode:
-        mode = await countdb.find_one({"chat_id": chat_id})
-        if not mode:
-            return 5
-        count[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await settings.upvotes.get(chat_id)
 
 
 async def set_upvotes(chat_id: int, mode: int):
-    count[chat_id] = mode
-    await countdb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await settings.set("upvotes", chat_id, mode)
 
 
 async def is_autoend() -> bool:
@@ -350,76 +534,35 @@ async def set_loop(chat_id: int, mode: int):
 
 
 async def get_cmode(chat_id: int) -> int:
-    mode = channelconnect.get(chat_id)
-    if not mode:
-        mode = await channeldb.find_one({"chat_id": chat_id})
-        if not mode:
-            return None
-        channelconnect[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await settings.cmode.get(chat_id)
 
 
 async def set_cmode(chat_id: int, mode: int):
-    channelconnect[chat_id] = mode
-    await channeldb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await settings.set("cmode", chat_id, mode)
 
 
 async def get_playtype(chat_id: int) -> str:
-    mode = playtype.get(chat_id)
-    if not mode:
-        mode = await playtypedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playtype[chat_id] = "Everyone"
-            return "Everyone"
-        playtype[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await settings.playtype.get(chat_id)
 
 
 async def set_playtype(chat_id: int, mode: str):
-    playtype[chat_id] = mode
-    await playtypedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await settings.set("playtype", chat_id, mode)
 
 
 async def get_playmode(chat_id: int) -> str:
-    mode = playmode.get(chat_id)
-    if not mode:
-        mode = await playmodedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playmode[chat_id] = "Direct"
-            return "Direct"
-        playmode[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await settings.playmode.get(chat_id)
 
 
 async def set_playmode(chat_id: int, mode: str):
-    playmode[chat_id] = mode
-    await playmodedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await settings.set("playmode", chat_id, mode)
 
 
 async def get_lang(chat_id: int) -> str:
-    mode = langm.get(chat_id)
-    if not mode:
-        lang = await langdb.find_one({"chat_id": chat_id})
-        if not lang:
-            langm[chat_id] = "my"
-            return "my"
-        langm[chat_id] = lang["lang"]
-        return lang["lang"]
-    return mode
+    return await settings.lang.get(chat_id)
 
 
 async def set_lang(chat_id: int, lang: str):
-    langm[chat_id] = lang
-    await langdb.update_one({"chat_id": chat_id}, {"$set": {"lang": lang}}, upsert=True)
+    await settings.set("lang", chat_id, lang)
 
 
 async def is_music_playing(chat_id: int) -> bool:
@@ -496,105 +639,184 @@ async def remove_active_video_chat(chat_id: int):
 
 
 async def check_nonadmin_chat(chat_id: int) -> bool:
-    user = await authdb.find_one({"chat_id": chat_id})
-    if not user:
-        return False
-    return True
+    return await settings.nonadmin.get(chat_id)
 
 
 async def is_nonadmin_chat(chat_id: int) -> bool:
-    mode = nonadmin.get(chat_id)
-    if not mode:
-        user = await authdb.find_one({"chat_id": chat_id})
-        if not user:
-            nonadmin[chat_id] = False
-            return False
-        nonadmin[chat_id] = True
-        return True
-    return mode
+    return await settings.nonadmin.get(chat_id)
 
 
 async def add_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = True
-    is_admin = await check_nonadmin_chat(chat_id)
-    if is_admin:
-        return
-    return await authdb.insert_one({"chat_id": chat_id})
+    await settings.set("nonadmin", chat_id, True)
 
 
 async def remove_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = False
-    is_admin = await check_nonadmin_chat(chat_id)
-    if not is_admin:
-        return
-    return await authdb.delete_one({"chat_id": chat_id})
+    await settings.set("nonadmin", chat_id, False)
 
 
 async def is_on_off(on_off: int) -> bool:
-    onoff = await onoffdb.find_one({"on_off": on_off})
-    if not onoff:
-        return False
-    return True
+    return await settings.onoff.get(on_off)
 
 
 async def add_on(on_off: int):
-    is_on = await is_on_off(on_off)
-    if is_on:
-        return
-    return await onoffdb.insert_one({"on_off": on_off})
+    await settings.set("onoff", on_off, True)
 
 
 async def add_off(on_off: int):
-    is_off = await is_on_off(on_off)
-    if not is_off:
-        return
-    return await onoffdb.delete_one({"on_off": on_off})
+    await settings.set("onoff", on_off, False)
 
 
+# on_off 1 marks maintenance mode; is_maintenance() is False while it is on.
 async def is_maintenance():
-    if not maintenance:
-        get = await onoffdb.find_one({"on_off": 1})
-        if not get:
-            maintenance.clear()
-            maintenance.append(2)
-            return True
-        else:
-            maintenance.clear()
-            maintenance.append(1)
-            return False
-    else:
-        if 1 in maintenance:
-            return False
-        else:
-            return True
+    return not await is_on_off(1)
 
 
 async def maintenance_off():
-    maintenance.clear()
-    maintenance.append(2)
-    is_off = await is_on_off(1)
-    if not is_off:
-        return
-    return await onoffdb.delete_one({"on_off": 1})
+    await add_off(1)
 
 
 async def maintenance_on():
-    maintenance.clear()
-    maintenance.append(1)
-    is_on = await is_on_off(1)
-    if is_on:
-        return
-    return await onoffdb.insert_one({"on_off": 1})
+    await add_on(1)
+
+
+class ServedIds:
+    """Ids already stored in a served collection, with new ones written in batches.
+
+    Known ids cost no database work. New ids are coalesced and upserted
+    with one unordered bulk_write every `interval` seconds, or as soon as
+    `batch` of them are waiting. Only ids the upsert actually inserted,
+    and that pass `counted` (the filter the counter is seeded with), are
+    added to the maintained counter.
+    """
+
+    def __init__(
+        self,
+        collection,
+        field: str,
+        counter: str,
+        counted: Callable[[int], bool],
+        interval: float,
+        batch: int,
+    ):
+        self.collection = collection
+        self.field = field
+        self.counter = counter
+        self.counted = counted
+        self.interval = interval
+        self.batch = batch
+        self.ids = set()
+        self.pending = set()
+        self.loaded = False
+        self.task = None
+        self.lock = asyncio.Lock()
+        self.flushes = 0
+        self.inserted = 0
+
+    async def load(self):
+        async for doc in self.collection.find({}, {self.field: 1, "_id": 0}):
+            if self.field in doc:
+                self.ids.add(doc[self.field])
+        self.loaded = True
+
+    async def contains(self, value: int) -> bool:
+        if value in self.ids:
+            return True
+        if self.loaded:
+            return False
+        return bool(await self.collection.find_one({self.field: value}))
+
+    async def add(self, value: int):
+        if value in self.ids:
+            return
+        self.ids.add(value)
+        self.pending.add(value)
+        if len(self.pending) >= self.batch:
+            await self.flush()
+
+    async def remove(self, value: int) -> bool:
+        # Under the flush lock, so an upsert in flight cannot re-add the row.
+        async with self.lock:
+            self.ids.discard(value)
+            self.pending.discard(value)
+            result = await self.collection.delete_one({self.field: value})
+            return bool(result.deleted_count)
+
+    async def flush(self):
+        async with self.lock:
+            if not self.pending:
+                return
+            values, self.pending = list(self.pending), set()
+            requests = [
+                UpdateOne(
+                    {self.field: value},
+                    {"$setOnInsert": {self.field: value}},
+                    upsert=True,
+                )
+                for value in values
+            ]
+            try:
+                result = await self.collection.bulk_write(requests, ordered=False)
+                upserted = list(result.upserted_ids)
+            except BulkWriteError as e:
+                # Another writer inserted some first; the rest still went through.
+                upserted = [op["index"] for op in e.details.get("upserted", [])]
+            except Exception:
+                self.pending.update(values)
+                raise
+            self.flushes += 1
+            self.inserted += len(upserted)
+            counted = sum(1 for index in upserted if self.counted(values[index]))
+            if counted:
+                await _bump(self.counter, counted)
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                LOGGER(__name__).warning(
+                    f"Flushing served ids to {self.counter} failed: {e}"
+                )
+
+    async def start(self):
+        if self.task is None:
+            await self.load()
+            self.task = asyncio.create_task(self._loop())
+
+    def stats(self) -> dict:
+        return {
+            "known": len(self.ids),
+            "pending": len(self.pending),
+            "flushes": self.flushes,
+            "inserted": self.inserted,
+        }
+
+
+served_users = ServedIds(
+    usersdb,
+    "user_id",
+    "served_users",
+    lambda user_id: user_id > 0,
+    config.SERVED_FLUSH_INTERVAL,
+    config.SERVED_BATCH_SIZE,
+)
+served_chats = ServedIds(
+    chatsdb,
+    "chat_id",
+    "served_chats",
+    lambda chat_id: chat_id < 0,
+    config.SERVED_FLUSH_INTERVAL,
+    config.SERVED_BATCH_SIZE,
+)
 
 
 async def is_served_user(user_id: int) -> bool:
-    user = await usersdb.find_one({"user_id": user_id})
-    if not user:
-        return False
-    return True
+    return await served_users.contains(user_id)
 
 
 async def get_served_users() -> list:
+    await served_users.flush()
     users_list = []
     async for user in usersdb.find({"user_id": {"$gt": 0}}):
         users_list.append(user)
@@ -602,13 +824,15 @@ async def get_served_users() -> list:
 
 
 async def add_served_user(user_id: int):
-    is_served = await is_served_user(user_id)
-    if is_served:
-        return
-    return await usersdb.insert_one({"user_id": user_id})
+    await served_users.add(user_id)
+
+
+async def get_served_users_count() -> int:
+    return await _counter("served_users", usersdb, {"user_id": {"$gt": 0}})
 
 
 async def get_served_chats() -> list:
+    await served_chats.flush()
     chats_list = []
     async for chat in chatsdb.find({"chat_id": {"$lt": 0}}):
         chats_list.append(chat)
@@ -616,21 +840,20 @@ async def get_served_chats() -> list:
 
 
 async def is_served_chat(chat_id: int) -> bool:
-    chat = await chatsdb.find_one({"chat_id": chat_id})
-    if not chat:
-        return False
-    return True
+    return await served_chats.contains(chat_id)
 
 
 async def add_served_chat(chat_id: int):
-    is_served = await is_served_chat(chat_id)
-    if is_served:
-        return
-    return await chatsdb.insert_one({"chat_id": chat_id})
+    await served_chats.add(chat_id)
 
 
 async def delete_served_chat(chat_id: int):
-    await chatsdb.delete_one({"chat_id": chat_id})
+    if await served_chats.remove(chat_id) and served_chats.counted(chat_id):
+        await _bump("served_chats", -1)
+
+
+async def get_served_chats_count() -> int:
+    return await _counter("served_chats", chatsdb, {"chat_id": {"$lt": 0}})
 
 
 async def blacklisted_chats() -> list:
@@ -0,0 +1,188 @@
+import ast
+import asyncio
+import os
+
+from pymongo.errors import OperationFailure
+
+from maythusharmusic.core.mongo import mongodb, profiler
+from maythusharmusic.logging import LOGGER
+
+# collection -> [(field, unique)]. Unique where the code keeps one document
+# per key; presence-style collections written with find-then-insert may
+# already hold duplicates, which is handled when the index is built.
+INDEXES = {
+    "adminauth": [("chat_id", True)],
+    "afk": [("user_id", True)],
+    "assistants": [("chat_id", True)],
+    "authuser": [("chat_id", True)],
+    "autoend": [("chat_id", False)],
+    "blacklistChat": [("chat_id", True)],
+    "blockedusers": [("user_id", True)],
+    "chats": [("chat_id", True)],
+    "chatsc": [("chat_id", True)],
+    "chatstats": [("chat_id", True)],
+    "clonebotnamedb": [("bot_id", False)],
+    "cloneownerdb": [("bot_id", False)],
+    "couple": [("chat_id", True)],
+    "cplaymode": [("chat_id", True)],
+    "filters.filters": [("chat_id", True)],
+    "gban": [("user_id", True)],
+    "language": [("chat_id", True)],
+    "onoffper": [("on_off", True)],
+    "playlist": [("chat_id", True)],
+    "playmode": [("chat_id", True)],
+    "playtypedb": [("chat_id", True)],
+    "privatechats": [("chat_id", True)],
+    "queries": [("chat_id", True)],
+    "skipmode": [("chat_id", True)],
+    "suggestion": [("chat_id", True)],
+    "sudoers": [("sudo", True)],
+    "tgusersdb": [("user_id", True)],
+    "tgusersdbc": [("user_id", True)],
+    "upcount": [("chat_id", True)],
+    "userstats": [("chat_id", True)],
+    "warns": [("chat_id", True)],
+}
+
+# Server error codes: duplicate key, and an index on these keys already exists with other options.
+DUPLICATE_KEY = 11000
+CONFLICTS = (85, 86)
+
+PACKAGE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shadowed by the utils/database package and never imported.
+STALE = {os.path.join("utils", "database.py")}
+MONGO_MODULES = ("maythusharmusic.core.mongo", "maythusharmusic.utils.mongo")
+QUERY_METHODS = {
+    "count_documents",
+    "delete_many",
+    "delete_one",
+    "find",
+    "find_one",
+    "find_one_and_delete",
+    "find_one_and_update",
+    "replace_one",
+    "update_many",
+    "update_one",
+}
+
+
+def _collection(node, databases: set):
+    """`db.name` or `db.name["sub"]` as a collection name, for a known database `db`."""
+    if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Constant):
+        parent = _collection(node.value, databases)
+        return f"{parent}.{node.slice.value}" if parent else None
+    if (
+        isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and node.value.id in databases
+    ):
+        return node.attr
+    return None
+
+
+def query_shapes(path: str) -> tuple:
+    """Collections one source file uses, and (collection, leading field, line)
+    for every literal query filter in it."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    databases = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module in MONGO_MODULES:
+            databases.update(alias.asname or alias.name for alias in node.names)
+        elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Attribute):
+            if node.value.attr == "maythusharmusic":
+                databases.update(t.id for t in node.targets if isinstance(t, ast.Name))
+    collections = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            name = _collection(node.value, databases)
+            if name:
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        collections[target.id] = name
+    used = {
+        collections[node.id]
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Name)
+        and isinstance(node.ctx, ast.Load)
+        and node.id in collections
+    }
+    shapes = []
+    for node in ast.walk(tree):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr in QUERY_METHODS
+            and isinstance(node.func.value, ast.Name)
+            and node.func.value.id in collections
+            and node.args
+            and isinstance(node.args[0], ast.Dict)
+            and node.args[0].keys
+            and isinstance(node.args[0].keys[0], ast.Constant)
+        ):
+            continue
+        shapes.append(
+            (collections[node.func.value.id], node.args[0].keys[0].value, node.lineno)
+        )
+    return used, shapes
+
+
+def audit() -> list:
+    """Problems found by reading the source: filters whose leading field has no
+    declared index, and declared collections nothing uses."""
+    problems = []
+    used = set()
+    for root, _, files in os.walk(PACKAGE):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, PACKAGE)
+            if not name.endswith(".py") or relative in STALE:
+                continue
+            collections, shapes = query_shapes(path)
+            used |= collections
+            for collection, field, line in shapes:
+                if field == "_id" or field.startswith("$"):
+                    continue
+                if field not in {indexed for indexed, _ in INDEXES.get(collection, [])}:
+                    problems.append(
+                        f"{relative}:{line} queries {collection} by {field} with no index"
+                    )
+    for collection in INDEXES:
+        if collection not in used:
+            problems.append(f"{collection} has indexes but is never used")
+    return problems
+
+
+async def _ensure(collection: str, field: str, unique: bool):
+    try:
+        await mongodb[collection].create_index(field, unique=unique)
+    except OperationFailure as e:
+        if e.code in CONFLICTS:
+            return
+        if e.code == DUPLICATE_KEY and unique:
+            LOGGER(__name__).warning(
+                f"{collection}.{field} has duplicate values; indexing it without uniqueness."
+            )
+            await mongodb[collection].create_index(field)
+            return
+        raise
+
+
+async def ensure_indexes():
+    """Create every declared index; existing ones are left as they are."""
+    for collection, fields in INDEXES.items():
+        profiler.covered[collection] = {field for field, _ in fields}
+    jobs = [
+        (collection, field, unique)
+        for collection, fields in INDEXES.items()
+        for field, unique in fields
+    ]
+    results = await asyncio.gather(
+        *(_ensure(*job) for job in jobs), return_exceptions=True
+    )
+    for (collection, field, _), result in zip(jobs, results):
+        if isinstance(result, Exception):
+            LOGGER(__name__).warning(f"Could not index {collection}.{field}: {result}")
+    LOGGER(__name__).info(f"Checked {len(jobs)} Mongo indexes.")
+    for problem in await asyncio.get_running_loop().run_in_executor(None, audit):
+        LOGGER(__name__).warning(f"Index audit: {problem}")
@@ -11,6 +11,7 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from maythusharmusic import YouTube, app
 from maythusharmusic.misc import SUDOERS
+from maythusharmusic.utils import perf
 from maythusharmusic.utils.database import (
     get_assistant,
     get_cmode,
@@ -115,7 +116,7 @@ def PlayWrapper(command):
             fplay = None
 
         if not await is_active_chat(chat_id):
-            userbot = await get_assistant(chat_id)
+            userbot = await get_assistant(chat_id, rebalance=True)
             try:
                 try:
                     get = await app.get_chat_member(chat_id, userbot.id)
@@ -181,17 +182,18 @@ def PlayWrapper(command):
                 except:
                     pass
 
-        return await command(
-            client,
-            message,
-            _,
-            chat_id,
-            video,
-            channel,
-            playmode,
-            url,
-            fplay,
-        )
+        async with perf.request("play", message.text or ""):
+            return await command(
+                client,
+                message,
+                _,
+                chat_id,
+                video,
+                channel,
+                playmode,
+                url,
+                fplay,
+            )
 
     return wrapper
 
@@ -284,7 +286,7 @@ def CPlayWrapper(command):
             fplay = None
 
         if not await is_active_chat(chat_id):
-            userbot = await get_assistant(chat_id)
+            userbot = await get_assistant(chat_id, rebalance=True)
             try:
                 try:
                     get = await client.get_chat_member(chat_id, userbot.id)
@@ -356,16 +358,17 @@ def CPlayWrapper(command):
                 except:
                     pass
 
-        return await command(
-            client,
-            message,
-            _,
-            chat_id,
-            video,
-            channel,
-            playmode,
-            url,
-            fplay,
-        )
+        async with perf.request("play", message.text or ""):
+            return await command(
+                client,
+                message,
+                _,
+                chat_id,
+                video,
+                channel,
+                playmode,
+                url,
+                fplay,
+            )
 
     return wrapper
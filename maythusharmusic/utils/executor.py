@@ -0,0 +1,105 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+
+class ExecutorBusy(Exception):
+    pass
+
+
+class ExecutorTimeout(Exception):
+    pass
+
+
+class BoundedExecutor:
+    """A named thread pool for one platform's blocking calls.
+
+    At most `workers + queue_size` calls may be admitted at once; further
+    callers wait up to the timeout for a slot. A call that times out or is
+    cancelled before a thread picks it up never runs.
+    """
+
+    def __init__(self, name: str, workers: int = 2, queue_size: int = 32, timeout: float = 60):
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix=name)
+        self.slots = None
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.worked = 0.0
+
+    def _call(self, func, args, kwargs):
+        self.running += 1
+        started = time.monotonic()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.worked += time.monotonic() - started
+            self.running -= 1
+
+    async def run(self, func, *args, timeout: float = None, **kwargs):
+        """Run func(*args, **kwargs) on this executor's threads and await it."""
+        timeout = timeout or self.timeout
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.workers + self.queue_size)
+        try:
+            await asyncio.wait_for(self.slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ExecutorBusy(f"{self.name} executor is full")
+        loop = asyncio.get_running_loop()
+        job = self.pool.submit(self._call, func, args, kwargs)
+        # The slot is freed when the thread is done with the call, not when
+        # the caller stops waiting, so timed-out calls still count against it.
+        job.add_done_callback(
+            lambda done: loop.call_soon_threadsafe(self._finished, done)
+        )
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(job)), timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise ExecutorTimeout(f"{self.name} call timed out after {timeout}s")
+        finally:
+            # Drops the call if it is still queued; a running thread finishes on its own.
+            job.cancel()
+
+    def _finished(self, future):
+        self.slots.release()
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    def stats(self) -> dict:
+        done = self.completed + self.failed
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "avg_run": round(self.worked / done, 3) if done else 0.0,
+        }
+
+
+executors = {
+    "soundcloud": BoundedExecutor(
+        "soundcloud", config.SOUNDCLOUD_WORKERS, timeout=config.PLATFORM_TIMEOUT
+    ),
+}
+
+
+async def run_blocking(platform: str, func, *args, **kwargs):
+    return await executors[platform].run(func, *args, **kwargs)
@@ -0,0 +1,209 @@
+import asyncio
+import queue
+import threading
+import time
+
+from yt_dlp import YoutubeDL
+
+from maythusharmusic.logging import LOGGER
+
+
+class ExtractorBusy(Exception):
+    pass
+
+
+class ExtractorTimeout(Exception):
+    pass
+
+
+class _Job:
+    __slots__ = ("func", "args", "future", "loop", "queued_at", "cancelled")
+
+    def __init__(self, func, args, future, loop):
+        self.func = func
+        self.args = args
+        self.future = future
+        self.loop = loop
+        self.queued_at = time.monotonic()
+        self.cancelled = False
+
+
+class ExtractorWorker:
+    """A thread that owns warm YoutubeDL instances bound to one cookie file.
+
+    The cookie is swapped for a fresh weighted pick whenever the pool's cookie
+    tracker quarantines it.
+    """
+
+    def __init__(self, pool, number: int):
+        self.pool = pool
+        self.number = number
+        self.cookiefile = None
+        self.instances = {}
+        self.busy = False
+        self.thread = threading.Thread(
+            target=self.run, name=f"ytdl-{number}", daemon=True
+        )
+
+    def ydl(self, profile: str) -> YoutubeDL:
+        ydl = self.instances.get(profile)
+        if ydl is None:
+            ydl = self.instances[profile] = YoutubeDL(self.options(profile))
+        return ydl
+
+    def options(self, profile: str, **extra) -> dict:
+        opts = dict(self.pool.profiles[profile])
+        opts.update(extra)
+        if self.cookiefile:
+            opts["cookiefile"] = self.cookiefile
+        return opts
+
+    def rotate_cookie(self):
+        cookies = self.pool.cookies
+        try:
+            self.cookiefile = cookies.pick() if cookies else None
+        except FileNotFoundError:
+            self.cookiefile = None
+        self.instances.clear()
+
+    def report(self, error):
+        cookies = self.pool.cookies
+        if cookies and self.cookiefile and cookies.report(self.cookiefile, error):
+            self.rotate_cookie()
+
+    def run(self):
+        self.rotate_cookie()
+        while True:
+            job = self.pool.jobs.get()
+            if job is None:
+                return
+            if job.cancelled:
+                job.loop.call_soon_threadsafe(_resolve, job.future, None, None)
+                continue
+            if self.cookiefile and not self.pool.cookies.usable(self.cookiefile):
+                self.rotate_cookie()
+            self.busy = True
+            started = time.monotonic()
+            self.pool.waited += started - job.queued_at
+            try:
+                result = job.func(self, *job.args)
+            except BaseException as e:
+                self.pool.failed += 1
+                self.report(e)
+                job.loop.call_soon_threadsafe(_resolve, job.future, None, e)
+            else:
+                self.pool.completed += 1
+                self.report(None)
+                job.loop.call_soon_threadsafe(_resolve, job.future, result, None)
+            finally:
+                self.pool.worked += time.monotonic() - started
+                self.busy = False
+
+
+def _resolve(future, result, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class ExtractorPool:
+    """Bounded job queue in front of long-lived yt-dlp worker threads."""
+
+    def __init__(
+        self,
+        profiles: dict,
+        cookies=None,
+        workers: int = 4,
+        queue_size: int = 64,
+        timeout: float = 300,
+    ):
+        self.profiles = profiles
+        self.cookies = cookies
+        self.size = workers
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self.jobs = queue.Queue()
+        self.slots = None
+        self.workers = []
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.waited = 0.0
+        self.worked = 0.0
+
+    def start(self):
+        if self.workers:
+            return
+        for number in range(self.size):
+            worker = ExtractorWorker(self, number)
+            self.workers.append(worker)
+            worker.thread.start()
+        LOGGER(__name__).info(f"Started {self.size} yt-dlp extractor workers.")
+
+    def stop(self):
+        for _ in self.workers:
+            self.jobs.put(None)
+        self.workers = []
+
+    async def _queue(self, func, args, timeout: float) -> _Job:
+        if not self.workers:
+            self.start()
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.size + self.queue_size)
+        try:
+            await asyncio.wait_for(self.slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ExtractorBusy("yt-dlp job queue is full")
+        loop = asyncio.get_running_loop()
+        job = _Job(func, args, loop.create_future(), loop)
+        job.future.add_done_callback(self._finished)
+        self.jobs.put(job)
+        return job
+
+    async def submit(self, func, *args) -> asyncio.Future:
+        """Queue func(worker, *args) without a deadline.
+
+        The returned future resolves only once a worker has finished the job,
+        for work such as downloads that must not be abandoned mid-way.
+        """
+        return (await self._queue(func, args, self.timeout)).future
+
+    async def run(self, func, *args, timeout: float = None):
+        """Run func(worker, *args) on a worker thread and await its result."""
+        job = await self._queue(func, args, timeout or self.timeout)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(job.future), timeout or self.timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise ExtractorTimeout(f"yt-dlp job timed out after {timeout or self.timeout}s")
+        finally:
+            # A job that never reached a worker is dropped instead of run late.
+            job.cancelled = True
+
+    def _finished(self, future):
+        self.slots.release()
+        # Mark late failures as retrieved once their caller has timed out.
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> dict:
+        done = self.completed + self.failed
+        return {
+            "workers": len(self.workers),
+            "busy": sum(1 for worker in self.workers if worker.busy),
+            "queued": self.jobs.qsize(),
+            "queue_size": self.queue_size,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "avg_wait": round(self.waited / done, 3) if done else 0.0,
+            "avg_run": round(self.worked / done, 3) if done else 0.0,
+        }
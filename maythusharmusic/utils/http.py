@@ -0,0 +1,125 @@
+import asyncio
+
+import aiohttp
+
+import config
+from maythusharmusic.logging import LOGGER
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT = {"GET", "HEAD", "OPTIONS"}
+
+
+class HTTPClient:
+    """One aiohttp session shared by every outbound request of the bot.
+
+    The connector keeps connections alive per host and caches DNS lookups,
+    so repeated calls to the same site skip the TCP/TLS handshake. Trace
+    hooks count how often a pooled connection was reused.
+    """
+
+    def __init__(self):
+        self.session = None
+        self.requests = 0
+        self.created = 0
+        self.reused = 0
+        self.dns_hits = 0
+        self.dns_misses = 0
+        self.retries = 0
+        self.errors = 0
+
+    def _trace(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(*_):
+            self.requests += 1
+
+        async def on_connection_create_end(*_):
+            self.created += 1
+
+        async def on_connection_reuseconn(*_):
+            self.reused += 1
+
+        async def on_dns_cache_hit(*_):
+            self.dns_hits += 1
+
+        async def on_dns_cache_miss(*_):
+            self.dns_misses += 1
+
+        async def on_request_exception(*_):
+            self.errors += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
+
+    def start(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=config.HTTP_LIMIT,
+                limit_per_host=config.HTTP_LIMIT_PER_HOST,
+                ttl_dns_cache=config.HTTP_DNS_TTL,
+                keepalive_timeout=config.HTTP_KEEPALIVE,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=config.HTTP_TIMEOUT, connect=min(10, config.HTTP_TIMEOUT)
+                ),
+                trace_configs=[self._trace()],
+            )
+        return self.session
+
+    async def request(self, method: str, url: str, retries: int = None, **kwargs):
+        """Send a request and return the response with its body already read.
+
+        Connection errors, timeouts and 429/5xx answers are retried with
+        backoff; by default only idempotent methods are retried.
+        """
+        if retries is None:
+            retries = config.HTTP_RETRIES if method.upper() in IDEMPOTENT else 0
+        for attempt in range(retries + 1):
+            try:
+                response = await self.start().request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == retries:
+                    raise
+            else:
+                if response.status not in RETRY_STATUSES or attempt == retries:
+                    async with response:
+                        await response.read()
+                    return response
+                response.release()
+            self.retries += 1
+            delay = 0.5 * 2**attempt
+            LOGGER(__name__).warning(f"{method} {url} failed, retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+    def stats(self) -> dict:
+        connections = self.created + self.reused
+        return {
+            "requests": self.requests,
+            "connections": self.created,
+            "reused": self.reused,
+            "reuse_ratio": round(self.reused / connections, 3) if connections else 0.0,
+            "dns_hits": self.dns_hits,
+            "dns_misses": self.dns_misses,
+            "retries": self.retries,
+            "errors": self.errors,
+        }
+
+
+http = HTTPClient()
@@ -45,21 +45,38 @@ def queue_markup(
     return upl
 
 
-def queue_back_markup(_, CPLAY):
-    upl = InlineKeyboardMarkup(
+def queue_back_markup(_, CPLAY, videoid=None, page: int = 0, pages: int = 1):
+    buttons = [
         [
+            InlineKeyboardButton(
+                text=_["BACK_BUTTON"],
+                callback_data=f"queue_back_timer {CPLAY}",
+            ),
+            InlineKeyboardButton(
+                text=_["CLOSE_BUTTON"],
+                callback_data="close",
+            ),
+        ]
+    ]
+    if pages > 1:
+        buttons.insert(
+            0,
             [
                 InlineKeyboardButton(
-                    text=_["BACK_BUTTON"],
-                    callback_data=f"queue_back_timer {CPLAY}",
+                    text="◁",
+                    callback_data=f"GetQueued {CPLAY}|{videoid}|{page - 1}",
                 ),
                 InlineKeyboardButton(
-                    text=_["CLOSE_BUTTON"],
-                    callback_data="close",
+                    text=f"{page + 1}/{pages}",
+                    callback_data="GetTimer",
                 ),
-            ]
-        ]
-    )
+                InlineKeyboardButton(
+                    text="▷",
+                    callback_data=f"GetQueued {CPLAY}|{videoid}|{page + 1}",
+                ),
+            ],
+        )
+    upl = InlineKeyboardMarkup(buttons)
     return upl
 
 
@@ -0,0 +1,97 @@
+import html
+import re
+
+import config
+from maythusharmusic.utils.cache import AsyncTTLCache
+from maythusharmusic.utils.http import http
+
+META = re.compile(rb"<meta\b[^>]*>", re.I)
+ATTR = re.compile(rb"""([a-zA-Z:_-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+HEAD_END = re.compile(rb"</head\s*>", re.I)
+CHUNK = 16384
+# Give up on pages that never close their <head>.
+MAX_BYTES = 2 * 1024 * 1024
+
+# (url, properties, whole head) -> {property: [content, ...]}
+page_meta = AsyncTTLCache(maxsize=512, ttl=config.META_CACHE_TTL)
+
+
+class MetaScanner:
+    """Incrementally collects <meta> contents for a few properties from raw page bytes.
+
+    Only complete tags are matched, so a tag split across two chunks is
+    picked up once the rest of it arrives. Scanning is done at </head>,
+    or as soon as every property has a value unless whole_head is set.
+    """
+
+    def __init__(self, properties: tuple, whole_head: bool = False):
+        self.wanted = {prop.encode() for prop in properties}
+        self.whole_head = whole_head
+        self.found = {}
+        self.buffer = b""
+        self.read = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        self.read += len(chunk)
+        self.buffer += chunk
+        head = HEAD_END.search(self.buffer)
+        scan = self.buffer[: head.start()] if head else self.buffer
+        end = 0
+        for match in META.finditer(scan):
+            end = match.end()
+            attrs = {
+                name.lower(): double or single
+                for name, double, single in ATTR.findall(match.group())
+            }
+            key = attrs.get(b"property") or attrs.get(b"name")
+            if key in self.wanted and b"content" in attrs:
+                self.found.setdefault(key, []).append(attrs[b"content"])
+        # Keep only a trailing tag that may still be incomplete.
+        cut = self.buffer.rfind(b"<", end)
+        self.buffer = self.buffer[cut:] if cut != -1 else b""
+        self.done = bool(
+            head
+            or self.read >= MAX_BYTES
+            or (not self.whole_head and len(self.found) == len(self.wanted))
+        )
+        return self.done
+
+    def result(self) -> dict:
+        return {
+            key.decode(): [
+                html.unescape(value.decode("utf-8", "replace")) for value in values
+            ]
+            for key, values in self.found.items()
+        }
+
+
+async def _scan(url: str, properties: tuple, whole_head: bool):
+    scanner = MetaScanner(properties, whole_head)
+    async with http.start().get(url) as response:
+        if response.status != 200:
+            return None
+        # Leaving the block early drops the rest of the body unread.
+        async for chunk in response.content.iter_chunked(CHUNK):
+            if scanner.feed(chunk):
+                break
+    return scanner.result()
+
+
+async def meta(url: str, *properties: str) -> dict:
+    """First content of each requested meta property, reading no more of the page than needed."""
+    found = await page_meta.fetch(
+        (url, properties, False), _scan, url, properties, False
+    )
+    return {key: values[0] for key, values in (found or {}).items()}
+
+
+async def meta_all(url: str, prop: str):
+    """Every content of one meta property in the page's <head>.
+
+    None means the page could not be fetched, as opposed to [] for a page without it.
+    """
+    found = await page_meta.fetch((url, (prop,), True), _scan, url, (prop,), True)
+    if found is None:
+        return None
+    return found.get(prop, [])
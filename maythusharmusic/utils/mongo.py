@@ -14,8 +14,9 @@ from typing import Dict, Union
 from motor.motor_asyncio import AsyncIOMotorClient as MongoCli
 
 from config import MONGO_DB_URI
+from maythusharmusic.core.mongo import profiler
 
-mongo = MongoCli(MONGO_DB_URI)
+mongo = MongoCli(MONGO_DB_URI, event_listeners=[profiler])
 db = mongo.maythusharmusic
 
 coupledb = db.couple
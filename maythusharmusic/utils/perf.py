@@ -0,0 +1,170 @@
+import bisect
+import contextvars
+import functools
+import re
+import time
+from collections import deque
+
+from maythusharmusic.logging import LOGGER
+
+# Upper bounds (in seconds) of the exported histogram buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Histogram:
+    """Cumulative bucket counts for export plus a window of recent samples for percentiles."""
+
+    __slots__ = ("counts", "total", "count", "samples")
+
+    def __init__(self, window: int = 1024):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.samples.append(seconds)
+
+    def percentiles(self, *quantiles) -> list:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return [0.0 for _ in quantiles]
+        return [
+            ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in quantiles
+        ]
+
+
+stages = {}
+providers = {}
+recent = deque(maxlen=200)
+_request = contextvars.ContextVar("perf_request", default=None)
+
+
+def observe(stage: str, seconds: float):
+    histogram = stages.get(stage)
+    if histogram is None:
+        histogram = stages[stage] = Histogram()
+    histogram.observe(seconds)
+
+
+class span:
+    """Times a block as one stage, and as part of the request it runs under."""
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        observe(self.stage, elapsed)
+        record = _request.get()
+        if record is not None:
+            record["stages"].append((self.stage, elapsed))
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *exc):
+        return self.__exit__(*exc)
+
+
+def timed(stage: str):
+    """Decorator that wraps a coroutine function in a span."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class request:
+    """Groups the spans of one user request so the slowest can be inspected."""
+
+    __slots__ = ("record", "token")
+
+    def __init__(self, kind: str, label: str = ""):
+        self.record = {"kind": kind, "label": label[:64], "stages": []}
+
+    async def __aenter__(self):
+        self.record["started"] = time.perf_counter()
+        self.record["at"] = time.time()
+        self.token = _request.set(self.record)
+        return self.record
+
+    async def __aexit__(self, *exc):
+        _request.reset(self.token)
+        self.record["total"] = time.perf_counter() - self.record["started"]
+        observe(self.record["kind"], self.record["total"])
+        recent.append(self.record)
+        return False
+
+
+def slowest(count: int = 5) -> list:
+    return sorted(recent, key=lambda record: record["total"], reverse=True)[:count]
+
+
+def register(name: str, stats):
+    """Export the numeric fields of stats() as gauges named after name."""
+    providers[name] = stats
+
+
+def _metric(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def render() -> str:
+    lines = [
+        "# HELP maythusharmusic_stage_seconds Time spent per instrumented stage.",
+        "# TYPE maythusharmusic_stage_seconds histogram",
+    ]
+    for stage, histogram in sorted(stages.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+            cumulative += count
+            lines.append(
+                f'maythusharmusic_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}'
+            )
+        lines.append(
+            f'maythusharmusic_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}'
+        )
+        lines.append(
+            f'maythusharmusic_stage_seconds_count{{stage="{stage}"}} {histogram.count}'
+        )
+    for name, stats in sorted(providers.items()):
+        try:
+            values = stats()
+        except Exception:
+            continue
+        for key, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"maythusharmusic_{_metric(name)}_{_metric(key)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+async def serve(host: str, port: int):
+    from aiohttp import web
+
+    async def metrics(_):
+        return web.Response(text=render(), content_type="text/plain", charset="utf-8")
+
+    server = web.Application()
+    server.router.add_get("/metrics", metrics)
+    runner = web.AppRunner(server, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    LOGGER(__name__).info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
@@ -1,18 +1,28 @@
-import os
+import config
+from maythusharmusic.logging import LOGGER
+from maythusharmusic.utils.cache import MediaCache
 
-from config import autoclean
+media_cache = MediaCache(
+    "downloads", config.DOWNLOAD_CACHE_LIMIT, config.DOWNLOAD_CACHE_POLICY
+)
+LOGGER(__name__).info(
+    f"Indexed {len(media_cache._files)} cached downloads ({media_cache.size} bytes)."
+)
 
 
 async def auto_clean(popped):
+    # Finished tracks stay on disk for replays; the cache evicts them once
+    # nothing queued references them and the byte budget is exceeded.
     try:
-        rem = popped["file"]
-        autoclean.remove(rem)
-        count = autoclean.count(rem)
-        if count == 0:
-            if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
-                try:
-                    os.remove(rem)
-                except:
-                    pass
+        media_cache.unpin(popped["file"])
     except:
         pass
+
+
+def adopt(track, file_path):
+    # put_queue pinned the vid_ placeholder; pin the real download instead so
+    # it can't be evicted mid-play, and auto_clean unpins it when it ends.
+    if track["file"] != file_path:
+        media_cache.unpin(track["file"])
+        media_cache.pin(file_path)
+        track["file"] = file_path
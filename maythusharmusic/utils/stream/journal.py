@@ -0,0 +1,234 @@
+import asyncio
+import json
+import os
+import time
+
+import config
+from maythusharmusic import YouTube
+from maythusharmusic.core.call import Hotty
+from maythusharmusic.logging import LOGGER
+from maythusharmusic.misc import db
+from maythusharmusic.utils.formatters import seconds_to_min
+from maythusharmusic.utils.stream import prefetch
+from maythusharmusic.utils.stream.autoclear import media_cache
+from maythusharmusic.utils.stream.tracks import Track, TrackQueue
+
+# Fields that only make sense inside the running process.
+SKIP_FIELDS = ("mystic", "markup", "speed_path")
+
+
+class QueueJournal:
+    """Append-only journal of queue snapshots, replayed after a restart.
+
+    A full snapshot is written only when a chat's queue changes shape. While
+    a track plays, only a small position record is appended. A torn last line
+    from a crash is ignored on replay, and the file is rewritten through a
+    temporary file once it grows well past the live state.
+    """
+
+    def __init__(self, path: str, interval: float = 2):
+        self.path = path
+        self.interval = interval
+        self.shapes = {}
+        self.positions = {}
+        self.records = 0
+        self.task = None
+
+    @staticmethod
+    def _track(track) -> dict:
+        data = {
+            key: value for key, value in track.to_dict().items() if key not in SKIP_FIELDS
+        }
+        if data.get("old_dur"):
+            data["dur"] = data.pop("old_dur")
+            data["seconds"] = data.pop("old_second", data["seconds"])
+            data.pop("speed", None)
+            data["played"] = 0
+        return data
+
+    def _changes(self) -> list:
+        now = int(time.time())
+        lines = []
+        for chat_id in set(db) | set(self.shapes):
+            queue = db.get(chat_id)
+            if not queue:
+                if self.shapes.pop(chat_id, None):
+                    self.positions.pop(chat_id, None)
+                    lines.append({"chat": chat_id, "at": now, "queue": []})
+                continue
+            shape = tuple((track.id, str(track["file"])) for track in queue)
+            head = queue[0]
+            played = int(head.get("played") or 0)
+            if self.shapes.get(chat_id) != shape:
+                self.shapes[chat_id] = shape
+                self.positions[chat_id] = played
+                lines.append(
+                    {
+                        "chat": chat_id,
+                        "at": now,
+                        "queue": [self._track(track) for track in queue],
+                    }
+                )
+            elif self.positions.get(chat_id) != played:
+                self.positions[chat_id] = played
+                lines.append(
+                    {"chat": chat_id, "at": now, "head": head.id, "played": played}
+                )
+        return lines
+
+    def _append(self, lines: list):
+        with open(self.path, "a") as f:
+            for line in lines:
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite(self, lines: list):
+        temp = f"{self.path}.tmp"
+        with open(temp, "w") as f:
+            for line in lines:
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+
+    def _snapshot(self) -> list:
+        self.shapes.clear()
+        self.positions.clear()
+        return self._changes()
+
+    async def flush(self):
+        loop = asyncio.get_running_loop()
+        if self.records > max(500, 20 * len(self.shapes)):
+            lines = self._snapshot()
+            await loop.run_in_executor(None, self._rewrite, lines)
+            self.records = len(lines)
+            return
+        lines = self._changes()
+        if lines:
+            await loop.run_in_executor(None, self._append, lines)
+            self.records += len(lines)
+
+    async def _run(self):
+        while not await asyncio.sleep(self.interval):
+            try:
+                await self.flush()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Queue journal flush failed: {e}")
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        await self.flush()
+
+    def load(self, max_age: int = 0) -> dict:
+        """Replay the journal into {chat_id: [track dicts]}."""
+        state = {}
+        try:
+            f = open(self.path)
+        except FileNotFoundError:
+            return state
+        with f:
+            for raw in f:
+                try:
+                    line = json.loads(raw)
+                except ValueError:
+                    continue
+                chat_id = line["chat"]
+                if "queue" in line:
+                    state[chat_id] = line
+                elif chat_id in state and state[chat_id]["queue"]:
+                    head = state[chat_id]["queue"][0]
+                    if head.get("id") == line["head"]:
+                        head["played"] = line["played"]
+                        state[chat_id]["at"] = line["at"]
+        oldest = time.time() - max_age if max_age else 0
+        return {
+            chat_id: line["queue"]
+            for chat_id, line in state.items()
+            if line["queue"] and line["at"] >= oldest
+        }
+
+
+journal = QueueJournal(config.QUEUE_JOURNAL, config.QUEUE_JOURNAL_INTERVAL)
+
+
+def _rebuild(tracks: list) -> TrackQueue:
+    queue = TrackQueue()
+    for data in tracks:
+        data.pop("id", None)
+        file = str(data.get("file"))
+        placeholder = file.startswith(("vid_", "live_", "index_"))
+        if not placeholder and not os.path.isfile(file):
+            if data.get("vidid") in ("telegram", "soundcloud"):
+                continue
+            data["file"] = f"vid_{data['vidid']}"
+        queue.append(Track(**data))
+        media_cache.pin(data["file"])
+    return queue
+
+
+async def _resume(chat_id: int):
+    track = db[chat_id][0]
+    file = str(track["file"])
+    video = str(track["streamtype"]) == "video"
+    played = int(track.get("played") or 0)
+    if "live_" in file:
+        n, link = await YouTube.video(track["vidid"], True)
+        if n == 0:
+            raise Exception(link)
+        played = 0
+    elif "index_" in file:
+        link = track["vidid"]
+        played = 0
+    elif "vid_" in file:
+        link, _ = await YouTube.download(track["vidid"], None, videoid=True, video=video)
+        media_cache.unpin(file)
+        media_cache.pin(link)
+        track["file"] = link
+    else:
+        link = file
+    await Hotty.join_call(chat_id, track["chat_id"], link, video=video)
+    if played and track["seconds"]:
+        await Hotty.seek_stream(
+            chat_id,
+            link,
+            seconds_to_min(played),
+            track["dur"],
+            "video" if video else "audio",
+        )
+    track["played"] = played
+    prefetch.schedule(chat_id)
+
+
+async def restore():
+    """Rehydrate queues from the journal and rejoin their calls in parallel."""
+    loop = asyncio.get_running_loop()
+    saved = await loop.run_in_executor(None, journal.load, config.QUEUE_RESUME_MAX_AGE)
+    for chat_id, tracks in saved.items():
+        queue = _rebuild(tracks)
+        if queue:
+            db[chat_id] = queue
+    chats = [chat_id for chat_id in saved if db.get(chat_id)]
+    results = await asyncio.gather(
+        *(_resume(chat_id) for chat_id in chats), return_exceptions=True
+    )
+    resumed = 0
+    for chat_id, result in zip(chats, results):
+        if isinstance(result, BaseException):
+            LOGGER(__name__).warning(f"Could not resume playback in {chat_id}: {result}")
+            for track in db.pop(chat_id, []):
+                media_cache.unpin(track["file"])
+            prefetch.cancel(chat_id)
+        else:
+            resumed += 1
+    await loop.run_in_executor(None, journal._rewrite, journal._snapshot())
+    journal.records = len(journal.shapes)
+    journal.start()
+    if chats:
+        LOGGER(__name__).info(f"Resumed playback in {resumed}/{len(chats)} chats.")
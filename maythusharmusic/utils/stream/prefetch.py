@@ -0,0 +1,102 @@
+import asyncio
+
+import config
+from maythusharmusic import YouTube
+from maythusharmusic.logging import LOGGER
+from maythusharmusic.misc import db
+from maythusharmusic.utils.stream.autoclear import media_cache
+
+# chat_id -> {(vidid, streamtype): Task}
+prefetching = {}
+slots = asyncio.Semaphore(config.PREFETCH_WORKERS)
+stats = {"started": 0, "ready": 0, "failed": 0, "cancelled": 0, "used": 0}
+
+
+def _key(entry):
+    return entry["vidid"], entry["streamtype"]
+
+
+def schedule(chat_id: int):
+    """Start downloading the next PREFETCH_AHEAD placeholder entries of a queue."""
+    queue = db.get(chat_id)
+    running = prefetching.setdefault(chat_id, {})
+    wanted = set()
+    if queue and config.PREFETCH_AHEAD > 0:
+        # The playing entry stays wanted so a download it is waiting on survives.
+        for position, entry in enumerate(queue.page(0, config.PREFETCH_AHEAD + 1)):
+            if "vid_" not in str(entry["file"]):
+                continue
+            key = _key(entry)
+            wanted.add(key)
+            if position and key not in running:
+                stats["started"] += 1
+                running[key] = asyncio.create_task(_prefetch(chat_id, key))
+    for key in list(running):
+        if key not in wanted:
+            task = running.pop(key)
+            if not task.done():
+                task.cancel()
+                stats["cancelled"] += 1
+
+
+def cancel(chat_id: int):
+    for task in prefetching.pop(chat_id, {}).values():
+        if not task.done():
+            task.cancel()
+            stats["cancelled"] += 1
+
+
+async def ready(chat_id: int, vidid: str, streamtype: str):
+    """Return the prefetched path for a queue entry, waiting if it is still downloading."""
+    task = prefetching.get(chat_id, {}).pop((vidid, streamtype), None)
+    if task is None:
+        return None
+    try:
+        file_path = await task
+    except (asyncio.CancelledError, Exception):
+        return None
+    if file_path:
+        stats["used"] += 1
+    return file_path
+
+
+async def _download(vidid: str, streamtype: str):
+    ratelimit = None
+    if config.PREFETCH_RATE_LIMIT:
+        ratelimit = config.PREFETCH_RATE_LIMIT // max(config.PREFETCH_WORKERS, 1)
+    return await YouTube.download(
+        vidid,
+        None,
+        videoid=True,
+        video=str(streamtype) == "video",
+        ratelimit=ratelimit,
+    )
+
+
+async def _prefetch(chat_id: int, key: tuple):
+    vidid, streamtype = key
+    async with slots:
+        job = asyncio.ensure_future(_download(vidid, streamtype))
+        try:
+            result = await asyncio.shield(job)
+        except asyncio.CancelledError:
+            # The executor thread can't be interrupted; keep the slot until it ends.
+            await asyncio.wait([job])
+            raise
+        except Exception as e:
+            stats["failed"] += 1
+            LOGGER(__name__).warning(f"Prefetch of {vidid} for {chat_id} failed: {e}")
+            return None
+    if not result:
+        stats["failed"] += 1
+        return None
+    file_path, direct = result
+    if not direct:
+        return None
+    placeholder = f"vid_{vidid}"
+    for entry in db.get(chat_id) or []:
+        if entry["file"] == placeholder and entry["streamtype"] == streamtype:
+            entry["file"] = file_path
+            media_cache.pin(file_path)
+    stats["ready"] += 1
+    return file_path
@@ -0,0 +1,220 @@
+import asyncio
+import time
+import zlib
+
+from pyrogram.errors import FloodWait, MessageNotModified
+from pyrogram.types import InlineKeyboardMarkup
+
+import config
+from maythusharmusic.logging import LOGGER
+from maythusharmusic.misc import db
+from maythusharmusic.utils.database import get_lang
+from maythusharmusic.utils.formatters import seconds_to_min
+from maythusharmusic.utils.inline import stream_markup_timer
+from strings import get_string
+
+
+class _Watch:
+    __slots__ = ("message", "render", "interval", "due", "rendered", "failures")
+
+    def __init__(self, message, render, interval: float):
+        self.message = message
+        self.render = render
+        self.interval = interval
+        # Spread first edits across the interval instead of firing them together.
+        self.due = time.monotonic() + zlib.crc32(str(message.id).encode()) % max(
+            int(interval), 1
+        )
+        self.rendered = None
+        self.failures = 0
+
+
+def _signature(markup) -> tuple:
+    return tuple(
+        (button.text, button.callback_data)
+        for row in markup.inline_keyboard
+        for button in row
+    )
+
+
+class ProgressScheduler:
+    """Refreshes progress-bar markups under one global edit budget.
+
+    Every watched message has its own interval. Edits are paid for from a
+    token bucket refilled at `rate` edits per second, so a busy tick defers
+    the overflow to the next one instead of bursting into a FloodWait. Edits
+    within one chat are also spaced at least `chat_gap` seconds apart, since
+    Telegram limits each chat separately. A markup identical to the last one
+    sent is skipped without an API call.
+    """
+
+    def __init__(
+        self,
+        interval: float = 7,
+        rate: float = 20,
+        chat_gap: float = 3,
+        tick: float = 1,
+    ):
+        self.interval = interval
+        self.rate = rate
+        self.chat_gap = chat_gap
+        self.tick = tick
+        self.chat_edits = {}
+        self.tokens = rate
+        self.refilled = time.monotonic()
+        self.blocked_until = 0.0
+        self.watches = {}
+        self.task = None
+        self.ticks = 0
+        self.tick_time = 0.0
+        self.last_tick = 0.0
+        self.max_tick = 0.0
+        self.edits = 0
+        self.skipped = 0
+        self.deferred = 0
+        self.failed = 0
+        self.flood_waits = 0
+
+    def watch(self, message, render, interval: float = None):
+        """Refresh message's markup with render() until it returns None."""
+        self.watches[(message.chat.id, message.id)] = _Watch(
+            message, render, interval or self.interval
+        )
+
+    def unwatch(self, message):
+        self.watches.pop((message.chat.id, message.id), None)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.rate, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+
+    async def _discover(self):
+        for chat_id, playing in list(db.items()):
+            if not playing:
+                continue
+            mystic = playing[0].get("mystic")
+            if mystic is None or not playing[0].get("seconds"):
+                continue
+            if (mystic.chat.id, mystic.id) in self.watches:
+                continue
+            try:
+                _ = get_string(await get_lang(chat_id))
+            except:
+                _ = get_string("en")
+            self.watch(mystic, _now_playing(_, chat_id, mystic.id))
+
+    async def _edit(self, key, watch: _Watch, markup):
+        try:
+            await watch.message.edit_reply_markup(reply_markup=markup)
+        except MessageNotModified:
+            self.skipped += 1
+        except FloodWait as e:
+            self.flood_waits += 1
+            self.blocked_until = time.monotonic() + e.value
+            watch.due = self.blocked_until
+            return
+        except Exception:
+            self.failed += 1
+            watch.failures += 1
+            if watch.failures >= 3:
+                self.watches.pop(key, None)
+            return
+        else:
+            self.edits += 1
+        watch.failures = 0
+        watch.rendered = _signature(markup)
+
+    async def run_tick(self):
+        started = time.monotonic()
+        await self._discover()
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.blocked_until:
+            return
+        chats = {chat_id for chat_id, _ in self.watches}
+        for chat_id in list(self.chat_edits):
+            if chat_id not in chats:
+                del self.chat_edits[chat_id]
+        due = sorted(
+            (watch.due, key) for key, watch in self.watches.items() if watch.due <= now
+        )
+        for _, key in due:
+            watch = self.watches.get(key)
+            if watch is None:
+                continue
+            try:
+                markup = watch.render()
+            except Exception:
+                markup = None
+            if markup is None:
+                self.watches.pop(key, None)
+                continue
+            if _signature(markup) == watch.rendered:
+                self.skipped += 1
+                watch.due = now + watch.interval
+                continue
+            last = self.chat_edits.get(key[0])
+            if self.tokens < 1 or (last is not None and now - last < self.chat_gap):
+                self.deferred += 1
+                continue
+            self.tokens -= 1
+            self.chat_edits[key[0]] = now
+            watch.due = now + watch.interval
+            await self._edit(key, watch, markup)
+            if time.monotonic() < self.blocked_until:
+                break
+        self.last_tick = time.monotonic() - started
+        self.max_tick = max(self.max_tick, self.last_tick)
+        self.tick_time += self.last_tick
+        self.ticks += 1
+
+    async def run(self):
+        while not await asyncio.sleep(self.tick):
+            try:
+                await self.run_tick()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Progress tick failed: {e}")
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    def stats(self) -> dict:
+        return {
+            "watched": len(self.watches),
+            "tokens": round(self.tokens, 1),
+            "edits": self.edits,
+            "skipped": self.skipped,
+            "deferred": self.deferred,
+            "failed": self.failed,
+            "flood_waits": self.flood_waits,
+            "ticks": self.ticks,
+            "last_tick": round(self.last_tick, 4),
+            "avg_tick": round(self.tick_time / self.ticks, 4) if self.ticks else 0.0,
+            "max_tick": round(self.max_tick, 4),
+        }
+
+
+def _now_playing(_, chat_id: int, message_id: int):
+    def render():
+        playing = db.get(chat_id)
+        if not playing:
+            return None
+        mystic = playing[0].get("mystic")
+        if mystic is None or mystic.id != message_id:
+            return None
+        return InlineKeyboardMarkup(
+            stream_markup_timer(
+                _,
+                chat_id,
+                seconds_to_min(playing[0]["played"]),
+                playing[0]["dur"],
+            )
+        )
+
+    return render
+
+
+progress = ProgressScheduler(
+    config.PROGRESS_INTERVAL, config.PROGRESS_RATE, config.PROGRESS_CHAT_GAP
+)
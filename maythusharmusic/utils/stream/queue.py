@@ -2,8 +2,11 @@ import asyncio
 from typing import Union
 from pyrogram import Client, client
 from maythusharmusic.misc import db
+from maythusharmusic.utils.stream import prefetch
+from maythusharmusic.utils.stream.autoclear import media_cache
+from maythusharmusic.utils.stream.tracks import Track, TrackQueue
 from maythusharmusic.utils.formatters import check_duration, seconds_to_min
-from config import autoclean, time_to_seconds
+from config import time_to_seconds
 
 
 async def put_queue(
@@ -23,28 +26,28 @@ async def put_queue(
         duration_in_seconds = time_to_seconds(duration) - 3
     except:
         duration_in_seconds = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "user_id": user_id,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": duration_in_seconds,
-        "played": 0,
-    }
+    put = Track(
+        title=title,
+        dur=duration,
+        streamtype=stream,
+        by=user,
+        user_id=user_id,
+        chat_id=original_chat_id,
+        file=file,
+        vidid=vidid,
+        seconds=duration_in_seconds,
+        played=0,
+    )
     if forceplay:
         check = db.get(chat_id)
         if check:
             check.insert(0, put)
         else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+            db[chat_id] = TrackQueue([put])
     else:
         db[chat_id].append(put)
-    autoclean.append(file)
+    media_cache.pin(file)
+    prefetch.schedule(chat_id)
 
 
 async def put_queue_index(
@@ -69,23 +72,22 @@ async def put_queue_index(
             dur = 0
     else:
         dur = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": dur,
-        "played": 0,
-    }
+    put = Track(
+        title=title,
+        dur=duration,
+        streamtype=stream,
+        by=user,
+        chat_id=original_chat_id,
+        file=file,
+        vidid=vidid,
+        seconds=dur,
+        played=0,
+    )
     if forceplay:
         check = db.get(chat_id)
         if check:
             check.insert(0, put)
         else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+            db[chat_id] = TrackQueue([put])
     else:
         db[chat_id].append(put)
@@ -1,4 +1,7 @@
+import asyncio
 import os
+from collections import deque
+from contextlib import aclosing
 from random import randint
 from typing import Union
 
@@ -13,9 +16,45 @@ from maythusharmusic.utils.exceptions import AssistantErr
 from maythusharmusic.utils.inline import aq_markup, close_markup, stream_markup
 from maythusharmusic.utils.pastebin import HottyBin
 from maythusharmusic.utils.stream.queue import put_queue, put_queue_index
+from maythusharmusic.utils.stream.tracks import TrackQueue
 from maythusharmusic.utils.thumbnails import get_thumb
 
 
+async def _details(search, spotify):
+    try:
+        if spotify:
+            search = await YouTube.resolve(search)
+            if not search:
+                return None
+        return await YouTube.details(search, True)
+    except Exception:
+        return None
+
+
+async def resolve_playlist(searches, spotify):
+    """Yield playlist entries' details in order, looking up a bounded window ahead."""
+    searches = iter(searches)
+    pending = deque()
+
+    def fill():
+        while len(pending) < config.PLAYLIST_RESOLVE_WORKERS:
+            search = next(searches, None)
+            if search is None:
+                return
+            pending.append(asyncio.ensure_future(_details(search, spotify)))
+
+    try:
+        fill()
+        while pending:
+            details = await pending.popleft()
+            fill()
+            if details:
+                yield details
+    finally:
+        for task in pending:
+            task.cancel()
+
+
 async def stream(
     _,
     mystic,
@@ -36,83 +75,81 @@ async def stream(
     if streamtype == "playlist":
         msg = f"{_['play_19']}\n\n"
         count = 0
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
-            try:
-                (
-                    title,
-                    duration_min,
-                    duration_sec,
-                    thumbnail,
-                    vidid,
-                ) = await YouTube.details(search, False if spotify else True)
-            except:
-                continue
-            if str(duration_min) == "None":
-                continue
-            if duration_sec > config.DURATION_LIMIT:
-                continue
-            if await is_active_chat(chat_id):
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                )
-                position = len(db.get(chat_id)) - 1
-                count += 1
-                msg += f"{count}. {title[:70]}\n"
-                msg += f"{_['play_20']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                status = True if video else None
-                try:
-                    file_path, direct = await YouTube.download(
-                        vidid, mystic, video=status, videoid=True
+        # Closing the generator on exit cancels lookups still in flight.
+        async with aclosing(resolve_playlist(result, spotify)) as tracks:
+            async for (
+                title,
+                duration_min,
+                duration_sec,
+                thumbnail,
+                vidid,
+            ) in tracks:
+                if int(count) == config.PLAYLIST_FETCH_LIMIT:
+                    break
+                if str(duration_min) == "None":
+                    continue
+                if duration_sec > config.DURATION_LIMIT:
+                    continue
+                if await is_active_chat(chat_id):
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        f"vid_{vidid}",
+                        title,
+                        duration_min,
+                        user_name,
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
                     )
-                except:
-                    raise AssistantErr(_["play_14"])
-                await Hotty.join_call(
-                    chat_id,
-                    original_chat_id,
-                    file_path,
-                    video=status,
-                    image=thumbnail,
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await get_thumb(vidid)
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    original_chat_id,
-                    photo=img,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{vidid}",
-                        title[:23],
+                    position = len(db.get(chat_id)) - 1
+                    count += 1
+                    msg += f"{count}. {title[:70]}\n"
+                    msg += f"{_['play_20']} {position}\n\n"
+                else:
+                    if not forceplay:
+                        db[chat_id] = TrackQueue()
+                    status = True if video else None
+                    try:
+                        file_path, direct = await YouTube.download(
+                            vidid, mystic, video=status, videoid=True
+                        )
+                    except:
+                        raise AssistantErr(_["play_14"])
+                    await Hotty.join_call(
+                        chat_id,
+                        original_chat_id,
+                        file_path,
+                        video=status,
+                        image=thumbnail,
+                    )
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        file_path if direct else f"vid_{vidid}",
+                        title,
                         duration_min,
                         user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
+                        forceplay=forceplay,
+                    )
+                    img = await get_thumb(vidid)
+                    button = stream_markup(_, chat_id)
+                    run = await app.send_photo(
+                        original_chat_id,
+                        photo=img,
+                        caption=_["stream_1"].format(
+                            f"https://t.me/{app.username}?start=info_{vidid}",
+                            title[:23],
+                            duration_min,
+                            user_name,
+                        ),
+                        reply_markup=InlineKeyboardMarkup(button),
+                    )
+                    db[chat_id][0]["mystic"] = run
+                    db[chat_id][0]["markup"] = "stream"
         if count == 0:
             return
         else:
@@ -172,7 +209,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = TrackQueue()
             await Hotty.join_call(
                 chat_id,
                 original_chat_id,
@@ -232,7 +269,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = TrackQueue()
             await Hotty.join_call(chat_id, original_chat_id, file_path, video=None)
             await put_queue(
                 chat_id,
@@ -284,7 +321,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = TrackQueue()
             await Hotty.join_call(chat_id, original_chat_id, file_path, video=status)
             await put_queue(
                 chat_id,
@@ -337,7 +374,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = TrackQueue()
             n, file_path = await YouTube.video(link)
             if n == 0:
                 raise AssistantErr(_["str_3"])
@@ -398,7 +435,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = TrackQueue()
             await Hotty.join_call(
                 chat_id,
                 original_chat_id,
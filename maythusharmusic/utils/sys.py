@@ -1,17 +1,132 @@
+import asyncio
 import time
+from collections import deque
 
 import psutil
 
+import config
+from maythusharmusic.logging import LOGGER
 from maythusharmusic.misc import _boot_
 from maythusharmusic.utils.formatters import get_readable_time
 
+SPARKS = "▁▂▃▄▅▆▇█"
+
+
+class SystemSampler:
+    """Samples host and process metrics on a fixed cadence into a ring buffer.
+
+    psutil is only called from a worker thread on the sampler's schedule;
+    stats commands read the latest sample and never wait on the system.
+    CPU percent is measured between consecutive samples, not over a sleep.
+    """
+
+    def __init__(self, interval: float = 5, history: int = 60):
+        self.interval = interval
+        self.samples = deque(maxlen=history)
+        self.process = psutil.Process()
+        self.task = None
+        self._net = None
+        self.info = {
+            "physical_cores": psutil.cpu_count(logical=False),
+            "logical_cores": psutil.cpu_count(logical=True),
+            "ram_total": psutil.virtual_memory().total,
+        }
+        # Primes the counters the first real sample is measured against.
+        psutil.cpu_percent(interval=None)
+        self.process.cpu_percent(interval=None)
+
+    def _ffmpeg(self) -> int:
+        count = 0
+        for child in self.process.children(recursive=True):
+            try:
+                if "ffmpeg" in child.name():
+                    count += 1
+            except psutil.Error:
+                pass
+        return count
+
+    def _sample(self) -> dict:
+        now = time.monotonic()
+        net = psutil.net_io_counters()
+        sent = recv = 0.0
+        if self._net is not None:
+            elapsed = max(now - self._net[0], 1e-6)
+            sent = (net.bytes_sent - self._net[1]) / elapsed
+            recv = (net.bytes_recv - self._net[2]) / elapsed
+        self._net = (now, net.bytes_sent, net.bytes_recv)
+        try:
+            freq = psutil.cpu_freq().current
+        except Exception:
+            freq = 0.0
+        try:
+            fds = self.process.num_fds()
+        except (AttributeError, psutil.Error):
+            fds = 0
+        disk = psutil.disk_usage("/")
+        return {
+            "at": time.time(),
+            "cpu": psutil.cpu_percent(interval=None),
+            "cpu_freq": freq,
+            "ram": psutil.virtual_memory().percent,
+            "disk": disk.percent,
+            "disk_total": disk.total,
+            "disk_used": disk.used,
+            "disk_free": disk.free,
+            "net_sent": sent,
+            "net_recv": recv,
+            "process_cpu": self.process.cpu_percent(interval=None),
+            "rss": self.process.memory_info().rss,
+            "fds": fds,
+            "ffmpeg": self._ffmpeg(),
+        }
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                self.samples.append(await loop.run_in_executor(None, self._sample))
+            except Exception as e:
+                LOGGER(__name__).warning(f"System sample failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._loop())
+
+    def latest(self) -> dict:
+        if not self.samples:
+            self.samples.append(self._sample())
+        return self.samples[-1]
+
+    def series(self, key: str) -> list:
+        return [sample[key] for sample in self.samples]
+
+    def sparkline(self, key: str, width: int = 20, top: float = None) -> str:
+        values = self.series(key)[-width:]
+        if not values:
+            return ""
+        top = top or max(values) or 1
+        return "".join(
+            SPARKS[min(len(SPARKS) - 1, int(value / top * (len(SPARKS) - 1)))]
+            for value in values
+        )
+
+    def stats(self) -> dict:
+        if not self.samples:
+            return {}
+        return {key: value for key, value in self.samples[-1].items() if key != "at"}
+
+
+sampler = SystemSampler(config.SYS_SAMPLE_INTERVAL, config.SYS_SAMPLE_HISTORY)
+
 
 async def bot_sys_stats():
     bot_uptime = int(time.time() - _boot_)
+    sample = sampler.latest()
     UP = f"{get_readable_time(bot_uptime)}"
-    CPU = f"{psutil.cpu_percent(interval=0.5)}%"
-    RAM = f"{psutil.virtual_memory().percent}%"
-    DISK = f"{psutil.disk_usage('/').percent}%"
+    CPU = f"{sample['cpu']}%"
+    RAM = f"{sample['ram']}%"
+    DISK = f"{sample['disk']}%"
     return UP, CPU, RAM, DISK
 
 
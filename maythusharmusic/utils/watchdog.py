@@ -0,0 +1,77 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+import config
+from maythusharmusic.logging import LOGGER
+from maythusharmusic.utils.perf import observe
+
+
+class LoopWatchdog:
+    """Logs the stack of whatever holds the event loop past a threshold.
+
+    A heartbeat task stamps the time every `interval` seconds. A daemon
+    thread watches the stamp and, once it is older than `threshold`, dumps
+    the loop thread's current stack, which points at the blocking call.
+    """
+
+    def __init__(self, threshold: float = 0.5, interval: float = 0.1):
+        self.threshold = threshold
+        self.interval = interval
+        self.beat = time.monotonic()
+        self.loop_thread = None
+        self.task = None
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self._reported = None
+
+    async def _heartbeat(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.last_lag = time.monotonic() - started - self.interval
+            self.max_lag = max(self.max_lag, self.last_lag)
+            observe("loop_lag", max(self.last_lag, 0.0))
+            if self.last_lag > self.threshold:
+                LOGGER(__name__).warning(
+                    f"Event loop was blocked for {self.last_lag:.3f}s."
+                )
+            self.beat = time.monotonic()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.threshold / 2)
+            beat = self.beat
+            if time.monotonic() - beat < self.threshold or self._reported == beat:
+                continue
+            self._reported = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=12))
+            LOGGER(__name__).warning(
+                f"Event loop blocked for over {self.threshold}s in:\n{stack}"
+            )
+
+    def start(self):
+        if self.task is not None:
+            return
+        self.loop_thread = threading.get_ident()
+        self.beat = time.monotonic()
+        self.task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stats(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            "stalls": self.stalls,
+            "last_lag": round(self.last_lag, 4),
+            "max_lag": round(self.max_lag, 4),
+        }
+
+
+watchdog = LoopWatchdog(config.LOOP_LAG_THRESHOLD)
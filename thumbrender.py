@@ -0,0 +1,269 @@
+"""Now-playing card rendering, run in the thumbnail worker processes.
+
+Kept outside the maythusharmusic package, whose import starts the bot's
+clients and git checks, so spawned workers import only Pillow and this file.
+"""
+
+import io
+import os
+import random
+import tempfile
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
+
+_assets = {}
+
+
+def changeImageSize(maxWidth, maxHeight, image):
+    widthRatio = maxWidth / image.size[0]
+    heightRatio = maxHeight / image.size[1]
+    newWidth = int(widthRatio * image.size[0])
+    newHeight = int(heightRatio * image.size[1])
+    newImage = image.resize((newWidth, newHeight))
+    return newImage
+
+def truncate(text):
+    list = text.split(" ")
+    text1 = ""
+    text2 = ""    
+    for i in list:
+        if len(text1) + len(i) < 30:        
+            text1 += " " + i
+        elif len(text2) + len(i) < 30:       
+            text2 += " " + i
+
+    text1 = text1.strip()
+    text2 = text2.strip()     
+    return [text1,text2]
+
+def random_color():
+    return (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+
+@lru_cache(maxsize=8)
+def gradient_mask(width, height):
+    # One column of the vertical ramp, stretched across the width.
+    column = Image.frombytes("L", (1, height), bytes(int(60 * (y / height)) for y in range(height)))
+    return column.resize((width, height), Image.NEAREST)
+
+def generate_gradient(width, height, start_color, end_color):
+    base = Image.new('RGBA', (width, height), start_color)
+    base.paste(end_color, (0, 0, width, height), gradient_mask(width, height))
+    return base
+
+def add_border(image, border_width, border_color):
+    width, height = image.size
+    new_width = width + 2 * border_width
+    new_height = height + 2 * border_width
+    new_image = Image.new("RGBA", (new_width, new_height), border_color)
+    new_image.paste(image, (border_width, border_width))
+    return new_image
+
+def crop_center_circle(img, output_size, border, border_color, crop_scale=1.5):
+    half_the_width = img.size[0] / 2
+    half_the_height = img.size[1] / 2
+    larger_size = int(output_size * crop_scale)
+    img = img.crop(
+        (
+            half_the_width - larger_size/2,
+            half_the_height - larger_size/2,
+            half_the_width + larger_size/2,
+            half_the_height + larger_size/2
+        )
+    )
+    
+    img = img.resize((output_size - 2*border, output_size - 2*border))
+    
+    
+    final_img = Image.new("RGBA", (output_size, output_size), border_color)
+    
+    
+    mask_main = Image.new("L", (output_size - 2*border, output_size - 2*border), 0)
+    draw_main = ImageDraw.Draw(mask_main)
+    draw_main.ellipse((0, 0, output_size - 2*border, output_size - 2*border), fill=255)
+    
+    final_img.paste(img, (border, border), mask_main)
+    
+    
+    mask_border = Image.new("L", (output_size, output_size), 0)
+    draw_border = ImageDraw.Draw(mask_border)
+    draw_border.ellipse((0, 0, output_size, output_size), fill=255)
+    
+    result = Image.composite(final_img, Image.new("RGBA", final_img.size, (0, 0, 0, 0)), mask_border)
+    
+    return result
+
+def draw_text_with_shadow(background, draw, position, text, font, fill, shadow_offset=(3, 3), shadow_blur=5):
+    if not text:
+        return
+    left, top, right, bottom = draw.textbbox(position, text, font=font)
+    # Blur only the text's own box, padded so the blur isn't clipped.
+    pad = shadow_blur * 3
+    shadow = Image.new('L', (right - left + 2 * pad, bottom - top + 2 * pad), 0)
+    ImageDraw.Draw(shadow).text(
+        (position[0] - left + pad, position[1] - top + pad), text, font=font, fill=255
+    )
+    shadow = shadow.filter(ImageFilter.GaussianBlur(radius=shadow_blur))
+    background.paste(
+        (0, 0, 0, 255),
+        (left - pad + shadow_offset[0], top - pad + shadow_offset[1]),
+        shadow,
+    )
+    draw.text(position, text, font=font, fill=fill)
+
+def load_assets():
+    if not _assets:
+        _assets["arial"] = ImageFont.truetype("maythusharmusic/assets/assets/font2.ttf", 30)
+        _assets["font"] = ImageFont.truetype("maythusharmusic/assets/assets/font.ttf", 30)
+        _assets["title_font"] = ImageFont.truetype("maythusharmusic/assets/assets/font3.ttf", 45)
+        play_icons = Image.open("maythusharmusic/assets/assets/play_icons.png")
+        _assets["play_icons"] = play_icons.resize((580, 62))
+    return _assets
+
+
+def render_card(content, output, key, title, duration, views, channel):
+    assets = load_assets()
+    rand = random.Random(key)
+    youtube = Image.open(io.BytesIO(content))
+    image1 = changeImageSize(1280, 720, youtube)
+
+    image2 = image1.convert("RGBA")
+    background = image2.filter(filter=ImageFilter.BoxBlur(20))
+    enhancer = ImageEnhance.Brightness(background)
+    background = enhancer.enhance(0.6)
+
+    start_gradient_color = (rand.randint(0, 255), rand.randint(0, 255), rand.randint(0, 255))
+    end_gradient_color = (rand.randint(0, 255), rand.randint(0, 255), rand.randint(0, 255))
+    gradient_image = generate_gradient(1280, 720, start_gradient_color, end_gradient_color)
+    background = Image.blend(background, gradient_image, alpha=0.2)
+
+    draw = ImageDraw.Draw(background)
+    arial = assets["arial"]
+    title_font = assets["title_font"]
+
+    circle_thumbnail = crop_center_circle(youtube, 400, 20, start_gradient_color)
+    circle_thumbnail = circle_thumbnail.resize((400, 400))
+    circle_position = (120, 160)
+    background.paste(circle_thumbnail, circle_position, circle_thumbnail)
+
+    text_x_position = 565
+    title1 = truncate(title)
+    draw_text_with_shadow(background, draw, (text_x_position, 180), title1[0], title_font, (255, 255, 255))
+    draw_text_with_shadow(background, draw, (text_x_position, 230), title1[1], title_font, (255, 255, 255))
+    draw_text_with_shadow(background, draw, (text_x_position, 320), f"{channel}  |  {views[:23]}", arial, (255, 255, 255))
+
+    line_length = 580
+    line_color = (rand.randint(0, 255), rand.randint(0, 255), rand.randint(0, 255))
+
+    if duration != "Live":
+        color_line_percentage = rand.uniform(0.15, 0.85)
+        color_line_length = int(line_length * color_line_percentage)
+
+        start_point_color = (text_x_position, 380)
+        end_point_color = (text_x_position + color_line_length, 380)
+        draw.line([start_point_color, end_point_color], fill=line_color, width=9)
+
+        start_point_white = (text_x_position + color_line_length, 380)
+        end_point_white = (text_x_position + line_length, 380)
+        draw.line([start_point_white, end_point_white], fill="white", width=8)
+    else:
+        line_color = (255, 0, 0)
+        start_point_color = (text_x_position, 380)
+        end_point_color = (text_x_position + line_length, 380)
+        draw.line([start_point_color, end_point_color], fill=line_color, width=9)
+
+    circle_radius = 10
+    circle_position = (end_point_color[0], end_point_color[1])
+    draw.ellipse([circle_position[0] - circle_radius, circle_position[1] - circle_radius,
+                  circle_position[0] + circle_radius, circle_position[1] + circle_radius], fill=line_color)
+
+    draw_text_with_shadow(background, draw, (text_x_position, 400), "00:00", arial, (255, 255, 255))
+    draw_text_with_shadow(background, draw, (1080, 400), duration, arial, (255, 255, 255))
+
+    play_icons = assets["play_icons"]
+    background.paste(play_icons, (text_x_position, 450), play_icons)
+
+    # A private temp file per render, so concurrent renders never share one.
+    fd, part = tempfile.mkstemp(dir=os.path.dirname(output), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            background.save(f, format="PNG")
+        os.replace(part, output)
+    except BaseException:
+        os.unlink(part)
+        raise
+    return output
+
+
+async def _benchmark(cards: int, workers: int):
+    """Cards per second and worst event-loop stall, rendering on the loop vs in a worker pool."""
+    import asyncio
+    import multiprocessing
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+
+    buffer = io.BytesIO()
+    Image.effect_mandelbrot((1280, 720), (-2, -1.2, 1, 1.2), 64).convert("RGB").save(
+        buffer, format="JPEG"
+    )
+    content = buffer.getvalue()
+    directory = tempfile.mkdtemp()
+
+    def args(n):
+        path = os.path.join(directory, f"{n}.png")
+        return content, path, str(n), f"Benchmark Card {n}", "3:45", "1M Views", "Channel"
+
+    async def measure(render):
+        stall = 0.0
+        running = True
+
+        async def ticker():
+            nonlocal stall
+            while running:
+                before = time.perf_counter()
+                await asyncio.sleep(0.01)
+                stall = max(stall, time.perf_counter() - before - 0.01)
+
+        tick = asyncio.create_task(ticker())
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        await render()
+        elapsed = time.perf_counter() - started
+        running = False
+        await tick
+        return cards / elapsed, stall * 1000
+
+    async def inline():
+        for n in range(cards):
+            render_card(*args(n))
+            await asyncio.sleep(0)
+
+    pool = ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("spawn"), initializer=load_assets
+    )
+    loop = asyncio.get_running_loop()
+    # Start the workers before timing, as a running bot would have them.
+    await asyncio.gather(*(loop.run_in_executor(pool, load_assets) for _ in range(workers)))
+
+    async def pooled():
+        await asyncio.gather(
+            *(loop.run_in_executor(pool, render_card, *args(n)) for n in range(cards))
+        )
+
+    for name, render in (("event loop", inline), (f"{workers} workers", pooled)):
+        rate, stall = await measure(render)
+        print(f"{name:>12}: {rate:6.2f} cards/s, worst loop stall {stall:7.1f} ms")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python thumbrender.py [cards] [workers]
+    import asyncio
+    import sys
+
+    asyncio.run(
+        _benchmark(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 2,
+        )
+    )